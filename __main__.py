@@ -1,17 +1,25 @@
 import sys
 import os
-import csv
-import pyinputplus as pyip
-
-from patientdata import update_total_patient, display_total_patient
-from patientdata import display_patient, display_room, display_bed
-from patientdata import add_new_patient, add_returning_patient
-from patientdata import modify_patient, modify_room
-from patientdata import delete_patient
-
-from patientdata import isEmptyDatabase, isAvailableRoom
-from patientdata import get_most_recent_bed_data, display_selected_data
-from patientdata import input_room_type
+import time
+import atexit
+import signal
+import json
+
+# menus (pyinputplus) and server (asyncio) are imported only when they are run,
+# so one-shot queries start fast
+from store import AdmissionStore
+from store import isEmptyDatabase, isAvailableRoom, get_most_recent_bed_data, NULL_PROFILE
+from storage import SharedData, LoadLimitError, read_admission_file, dict_of_list_to_csv, list_of_dict_to_csv
+from sqlitedata import SqliteData
+from metrics import METRICS, timed
+
+# journal size in bytes before it is written into base CSV files
+# (rows of change table with SQLite database)
+COMPACT_SIZE = 1024 * 1024
+# keep a binary snapshot next to base CSV files for faster loading
+USE_SNAPSHOT = True
+# maximum bytes of CSV files loaded into memory, None for no limit (--max-load BYTES)
+MAX_LOAD_BYTES = None
 
 def clear_screen():
     '''
@@ -22,201 +30,210 @@ def clear_screen():
     else:
         _ = os.system('clear') # macOS and Linux
 
-def load_patient(FILE_PATH):
+def check_journal():
     '''
-    Function to load patient data
-    
+    Function to read changes of other processes, and write journal into base files
+    once it grows large enough
+    '''
+    if store.shared.get_journal_size() >= COMPACT_SIZE:
+        store.compact(min_size=COMPACT_SIZE)
+    else:
+        store.refresh()
+
+def pop_option(name):
+    '''
+    Function to remove an option and its value from command line arguments
+
     Args:
-        FILE_PATH (str): path to CSV file containing patient data
-    
+        name (str): option name, e.g. --metrics
+
     Returns:
-        dict: patient data
+        str or None: option value, None if option is not given
     '''
-    file = open(FILE_PATH, "r")
-    reader = csv.reader(file, delimiter=";")
-    headings = next(reader)
-
-    try:
-        assert headings == ["Patient_ID", "First_Name", "Last_Name", "Gender", "Birth_Date"]
-    except:
-        headings = ["Patient_ID", "First_Name", "Last_Name", "Gender", "Birth_Date"]
-
-    database = {"column": headings}
-    for row in reader:
-        if len(row) == 0:
-            continue
-        patient_id, first_name, last_name, gender, birth_date = row
-        database.update(
-            {
-                str(patient_id): [
-                    str(patient_id), 
-                    str(first_name),
-                    str(last_name),
-                    str(gender),
-                    str(birth_date)
-                ]
-            }
-        )
-    file.close()
-    return database
-
-def load_room(FILE_PATH):
+    if name not in sys.argv:
+        return None
+    position = sys.argv.index(name)
+    if position + 1 >= len(sys.argv):
+        print(f"{name} needs a value.")
+        sys.exit(1)
+    value = sys.argv[position + 1]
+    del sys.argv[position:position + 2]
+    return value
+
+def start_metrics(FILE_PATH):
     '''
-    Function to load room admission data
-    
+    Function to record metrics of operations, written into file on exit and on SIGUSR1
+
     Args:
-        FILE_PATH (str): path to CSV file containing room admission data
-    
+        FILE_PATH (str): path to metrics file, JSON if it ends with .json, else Prometheus text format
+
     Returns:
-        list: room admission data
+        None
     '''
+    METRICS.isEnabled = True
+    atexit.register(METRICS.write, FILE_PATH)
+    # a running program can be asked for its metrics with kill -USR1 PID (not on Windows)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: METRICS.write(FILE_PATH))
 
-    file = open(FILE_PATH, "r")
-    reader = csv.reader(file, delimiter=";")
-    headings = next(reader)
-    try:
-        assert headings ==  ["Index", "Patient_ID", "Room_Type", "Admission_Date", "Discharge_Date", "Status"]
-    except:
-        headings = ["Index", "Patient_ID", "Room_Type", "Admission_Date", "Discharge_Date", "Status"]
-    database = []
-    database.append(headings)
-
-    for row in reader:
-        if len(row) == 0:
-            continue
-        dict_row = {}
-        index, patient_id, room_type, admission_date, discharge_date, status = row
-        dict_row.update(
-            {
-                headings[0]: int(index),
-                headings[1]: str(patient_id),
-                headings[2]: str(room_type),
-                headings[3]: str(admission_date),
-                headings[4]: str(discharge_date),
-                headings[5]: str(status)
-            }
-        )
-        database.append(dict_row)
-    file.close()
-
-    return database
-
-def load_bed(FILE_PATH):
+def start_profile(FILE_PATH):
     '''
-    Function to load bed availability data
-    
+    Function to profile the main thread with cProfile, with statistics written into file on exit
+
     Args:
-        FILE_PATH (str): path to .csv file containing bed availability data
-    
+        FILE_PATH (str): path to statistics file, read with python -m pstats FILE
+
     Returns:
-        list: bed availability data
+        None
     '''
-    file = open(FILE_PATH, "r")
-    reader = csv.reader(file, delimiter=";")
-    headings = next(reader)
-    # assign column names if headings is empty 
-    try:
-        assert headings ==  ["Index", "Timestamp", "VVIP", "VIP", "Kelas_1", "Kelas_2", "Kelas_3"]
-    except:
-        headings = ["Index", "Timestamp", "VVIP", "VIP", "Kelas_1", "Kelas_2", "Kelas_3"]
-    database = []
-    database.append(headings)
-
-    capacity_found = False
-    for row in reader:
-        if len(row) == 0:
-            continue
-
-        if not capacity_found:
-            try:
-                assert row[1] == "CAPACITY"
-            except:
-                print("Bed capacity data missing. Please enter bed capacity data first.")
-                sys.exit()
-            capacity_found = True
-
-        if capacity_found:
-            dict_row = {}
-            index, timestamp, vvip, vip, kelas_1, kelas_2, kelas_3 = row
-            dict_row.update(
-                {
-                    headings[0]: int(index),
-                    headings[1]: str(timestamp),
-                    headings[2]: int(vvip),
-                    headings[3]: int(vip),
-                    headings[4]: int(kelas_1),
-                    headings[5]: int(kelas_2),
-                    headings[6]: int(kelas_3)
-                }
-            )
-            database.append(dict_row)
-    file.close()
-    return database
-
-def load_total_patient(database):
+    # imported only when asked for, as profiling slows every call
+    import cProfile
+    profile = cProfile.Profile()
+    atexit.register(profile.dump_stats, FILE_PATH)
+    atexit.register(profile.disable)
+    profile.enable()
+
+@timed("run_import")
+def run_import(FILE_PATH):
     '''
-    Function to initialize total patient with keys from bed database keys other than Index
-    
+    Function to admit patients from admission import file and report the result
+
     Args:
-        database (list of dict)
-    
+        FILE_PATH (str): path to admission import file
+
     Returns:
-        dict
+        None
     '''
-    total_patient = {}
-    for key in database[1].keys():
-        if key == "Index":
-            continue
-        total_patient[key] = None
-    total_patient["Total"] = None
-    return total_patient
-
-def dict_of_list_to_csv(FILE_PATH, database):
+    try:
+        rows = read_admission_file(FILE_PATH)
+    except OSError as error:
+        print(f"Cannot read {FILE_PATH}: {error.strerror}.")
+        return
+    start = time.perf_counter()
+    admitted, rejected = store.import_admissions(rows)
+    duration = time.perf_counter() - start
+    total = admitted + len(rejected)
+
+    print(f"Admitted {admitted} of {total} rows in {duration:.2f} s ({total / max(duration, 1e-9):.0f} rows/s).")
+    if rejected:
+        print(f"Rejected {len(rejected)} rows:")
+        for line, reason in rejected:
+            print(f"  line {line}: {reason}")
+
+    check_journal()
+
+def print_row(row):
     '''
-    Function to write database into .csv file
-    
+    Function to print a row as "key : value" lines, as total patient data is displayed
+
     Args:
-        FILE_PATH (str): path to .csv file to be written
-        database (dict of list): database to be written into .csv file
-    
+        row (dict)
+
     Returns:
         None
     '''
-    file = open(FILE_PATH, "w", newline='')
-    writer = csv.writer(file, delimiter=";")
-    writer.writerows(database.values())
-    file.close()
+    for key, value in row.items():
+        print(f"{' '.join(key.split(sep='_')):20} : {value}")
 
-def list_of_dict_to_csv(FILE_PATH, database):
+def run_query(shared, query, room_type=None, isJson=False):
     '''
-    Function to write database into .csv file
-    
+    Function to answer a one-shot query reading only the data it needs, without loading all data
+
     Args:
-        FILE_PATH (str): path to .csv file to be written
-        database (list of dict): database to be written into .csv file
-    
+        shared (SharedData or SqliteData)
+        query (list): query name and its argument, e.g. ["availability"] or ["patient", "P-1"]
+        room_type (str or None): room type to answer for, None for all room types
+        isJson (bool): True to print answer as JSON
+
+    Returns:
+        int: exit status, 1 if patient ID or room type does not exist, or patient ID is deleted
+    '''
+    with shared:
+        if query[0] == "availability":
+            answer = shared.read_current_bed()
+            answer = {key: answer[key] for key in list(answer)[2:]}
+        elif query[0] == "census":
+            answer = shared.read_census()
+        else:
+            patient_row, admissions = shared.read_patient(query[1])
+
+    if query[0] == "patient":
+        if patient_row is None:
+            print(f"Patient ID {query[1]} does not exist.")
+            return 1
+        if patient_row[1:] == NULL_PROFILE:
+            print(f"{query[1]} is a deleted patient ID.")
+            return 1
+        header = ["Patient_ID", "First_Name", "Last_Name", "Gender", "Birth_Date"]
+        answer = dict(zip(header, patient_row))
+        answer["Admissions"] = [dict(row.items()) for row in admissions]
+        if isJson:
+            print(json.dumps(answer))
+            return 0
+        admissions = answer.pop("Admissions")
+        print_row(answer)
+        for row in admissions:
+            print(f"{'Admission':20} : " + " ".join(str(value) for value in list(row.values())[2:]))
+        return 0
+
+    if room_type is not None:
+        if room_type not in answer or room_type == "Total":
+            print(f"Room type {room_type} does not exist.")
+            return 1
+        answer = {room_type: answer[room_type]}
+    if isJson:
+        print(json.dumps(answer))
+    else:
+        print_row(answer)
+    return 0
+
+def run_migrate(shared, DB_PATH):
+    '''
+    Function to copy data of CSV files, with changes saved in journal, into a new SQLite database
+
+    Args:
+        shared (SharedData): CSV files and journal
+        DB_PATH (str): path to SQLite database to be created
+
     Returns:
         None
     '''
-    file = open(FILE_PATH, "w", newline='')
-    writer = csv.writer(file, delimiter=";")
-    database = [database[0]] + [row.values() for row in database[1:]]
-    writer.writerows(database)
-    file.close()
+    if os.path.exists(DB_PATH):
+        print(f"{DB_PATH} already exists.")
+        return
+    try:
+        with shared:
+            patient_db, room_db, bed_db = shared.load()
+    except LoadLimitError as error:
+        print(error)
+        return
+    # tables are written into a new database, which is moved to DB_PATH once all are written
+    root, extension = os.path.splitext(DB_PATH)
+    temporary_path = root + ".tmp" + extension
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+    dict_of_list_to_csv(temporary_path, patient_db)
+    list_of_dict_to_csv(temporary_path, room_db)
+    list_of_dict_to_csv(temporary_path, bed_db)
+    os.replace(temporary_path, DB_PATH)
+    print(f"Migrated {len(patient_db) - 1} patients, {len(room_db) - 1} room admissions, "
+          f"and {len(bed_db) - 1} bed availability rows into {DB_PATH}.")
 
 def main():
     '''
     Main program to run the entire process
     '''
-
-    global patient_db
-    global room_db
-    global bed_db
-    global total_patient_db
+    import pyinputplus as pyip
+    from patientdata import display_total_patient, display_settings
+    from patientdata import display_patient, display_room, display_bed
+    from patientdata import add_new_patient, add_returning_patient
+    from patientdata import modify_patient, modify_room
+    from patientdata import delete_patient
+    from patientdata import display_selected_data, input_room_type
 
     while True:
-        total_patient_db = update_total_patient(bed_db, total_patient_db)
-        
+        check_journal()
+
         prompt = "\n=== Main Menu ===\nPlease select one of the following:\n"
         choices = ["Display data",
                    "Add new admission",
@@ -232,33 +249,37 @@ def main():
                            "Display room data",
                            "Display bed data",
                            "Display total patient",
+                           "Display settings",
                            "Return to main menu"]
                 response = pyip.inputMenu(prompt=prompt, choices=choices, numbered=True)
                 
                 if response == choices[0]:
-                    if isEmptyDatabase(patient_db):
+                    if isEmptyDatabase(store.patient_database):
                         print("Patient database empty. Please add new patient first.")
                     else:
-                        display_patient(database=patient_db)          
+                        display_patient(store)
 
                 elif response == choices[1]:
-                    if isEmptyDatabase(room_db):
+                    if isEmptyDatabase(store.room_database):
                         print("Room database empty. Please add new room admission first.")
                     else:
-                        display_room(database=room_db)
+                        display_room(store)
 
                 elif response == choices[2]:
-                    display_bed(database=bed_db)
+                    display_bed(store)
                 
                 elif response == choices[3]:
-                    display_total_patient(database=total_patient_db)
+                    display_total_patient(database=store.census())
+
+                elif response == choices[4]:
+                    display_settings()
 
                 else:
                     break
         
         elif response == choices[1]:
             while True:
-                most_recent_data, bed_header = get_most_recent_bed_data(bed_db)
+                most_recent_data, bed_header = get_most_recent_bed_data(store.index_database)
                 display_selected_data(most_recent_data[1:], bed_header[1:], title="=== Bed Availability ===")
 
                 room_type, isBreak = input_room_type()
@@ -266,7 +287,7 @@ def main():
                 if isBreak:
                     break
             
-                if isAvailableRoom(most_recent_data, bed_header, room_type):
+                if isAvailableRoom(store.index_database, room_type):
                     while True:
                         prompt = "\n=== Add Menu ===\nPlease select one of the following:\n"
                         choices = ["Add new patient",
@@ -275,15 +296,13 @@ def main():
                         response = pyip.inputMenu(prompt=prompt, choices=choices, numbered=True)
         
                         if response == choices[0]:
-                            add_new_patient(patient_database=patient_db, room_database=room_db,
-                                            bed_database=bed_db, room_type=room_type)
+                            add_new_patient(store, room_type=room_type)
                             
                         elif response == choices[1]:
-                            if isEmptyDatabase(patient_db):
+                            if isEmptyDatabase(store.patient_database):
                                 print("Patient database empty. Please add new patient first.")
                             else:
-                                add_returning_patient(patient_database=patient_db, room_database=room_db,
-                                              bed_database=bed_db, room_type=room_type)
+                                add_returning_patient(store, room_type=room_type)
                         
                         break
                 
@@ -302,17 +321,16 @@ def main():
                 response = pyip.inputMenu(prompt=prompt, choices=choices, numbered=True)
 
                 if response == choices[0]:
-                    if isEmptyDatabase(patient_db):
+                    if isEmptyDatabase(store.patient_database):
                         print("Patient database empty. Please add new patient first.")
                     else:
-                        modify_patient(patient_database=patient_db)
+                        modify_patient(store)
 
                 elif response == choices[1]:
-                    if isEmptyDatabase(room_db):
+                    if isEmptyDatabase(store.room_database):
                         print("Room database empty. Please add new room admission first.")
                     else:
-                        modify_room(room_database=room_db,
-                                    bed_database=bed_db)
+                        modify_room(store)
                 
                 else:
                     break
@@ -325,10 +343,10 @@ def main():
                 response = pyip.inputMenu(prompt=prompt, choices=choices, numbered=True)
 
                 if response == choices[0]:
-                    if isEmptyDatabase(patient_db):
+                    if isEmptyDatabase(store.patient_database):
                         print("Patient database empty. Please add new patient first.")
                     else:
-                        delete_patient(patient_database=patient_db, room_database=room_db)
+                        delete_patient(store)
 
                 else:
                     break
@@ -337,7 +355,44 @@ def main():
             break
 
 if __name__ == "__main__":
-    clear_screen()
+    # metrics and profile of any mode: --metrics FILE.prom|FILE.json, --profile FILE.prof,
+    # and limit of CSV data loaded: --max-load BYTES
+    metrics_path = pop_option("--metrics")
+    profile_path = pop_option("--profile")
+    max_load = pop_option("--max-load")
+    if max_load is not None:
+        if not max_load.isdigit():
+            print("--max-load needs a number of bytes.")
+            sys.exit(1)
+        MAX_LOAD_BYTES = int(max_load)
+    if metrics_path:
+        start_metrics(metrics_path)
+    if profile_path:
+        start_profile(profile_path)
+
+    # admissions can be imported without menu: python __main__.py import FILE
+    isImport = len(sys.argv) == 3 and sys.argv[1] == "import"
+    # or served to other programs: python __main__.py serve [SOCKET]
+    isServe = len(sys.argv) in [2, 3] and sys.argv[1] == "serve"
+    # CSV files can be moved into SQLite database: python __main__.py migrate
+    isMigrate = len(sys.argv) == 2 and sys.argv[1] == "migrate"
+    # or answered one-shot queries for scripts: python __main__.py availability|census [--room ROOM] [--json]
+    # and python __main__.py patient P-1 [--json]
+    isJson = "--json" in sys.argv
+    if isJson:
+        sys.argv.remove("--json")
+    room_type = pop_option("--room")
+    isQuery = ((len(sys.argv) == 2 and sys.argv[1] in ["availability", "census"])
+               or (len(sys.argv) == 3 and sys.argv[1] == "patient" and room_type is None))
+    # --json and --room are options of queries only
+    isQueryOption = isJson or room_type is not None
+    if not isQuery and (isQueryOption or len(sys.argv) > 1 and not isImport and not isServe and not isMigrate):
+        print("Usage: python __main__.py [import FILE.csv|FILE.jsonl | serve [SOCKET] | migrate | "
+              "availability [--room ROOM] [--json] | census [--room ROOM] [--json] | patient PATIENT_ID [--json]] "
+              "[--metrics FILE.prom|FILE.json] [--profile FILE.prof] [--max-load BYTES]")
+        sys.exit(1)
+    if len(sys.argv) == 1:
+        clear_screen()
 
     # get current working directory
     CURRENT_DIR = os.getcwd()
@@ -346,33 +401,69 @@ if __name__ == "__main__":
     PATIENT_DB_PATH = os.path.join(CURRENT_DIR, "patient_data.csv")
     ROOM_DB_PATH = os.path.join(CURRENT_DIR, "room_data.csv")
     BED_DB_PATH = os.path.join(CURRENT_DIR, "bed_data.csv")
-
-    patient_file_size = os.path.getsize(PATIENT_DB_PATH)
-    room_file_size = os.path.getsize(ROOM_DB_PATH)
-    bed_file_size = os.path.getsize(BED_DB_PATH)
-
-    if patient_file_size > 0 and room_file_size > 0 and bed_file_size > 0:
-        # load data
-        bed_db = load_bed(BED_DB_PATH)
-        patient_db = load_patient(PATIENT_DB_PATH)
-        room_db = load_room(ROOM_DB_PATH)
-        total_patient_db = load_total_patient(bed_db)
-        
-        print('\n=== Welcome to JCDS Purwadhika Patient Admission Data System ===')
-        # run main program
-        main()
-        # keep database updated
-        dict_of_list_to_csv(PATIENT_DB_PATH, patient_db)
-        list_of_dict_to_csv(ROOM_DB_PATH, room_db)
-        list_of_dict_to_csv(BED_DB_PATH, bed_db)
+    JOURNAL_PATH = os.path.join(CURRENT_DIR, "journal_data.csv")
+    SNAPSHOT_PATH = os.path.join(CURRENT_DIR, "snapshot_data.bin")
+    CSV_PATHS = [PATIENT_DB_PATH, ROOM_DB_PATH, BED_DB_PATH]
+    # SQLite database used instead of CSV files once it exists
+    DB_PATH = os.path.join(CURRENT_DIR, "admission.db")
+
+    shared = None
+    if os.path.exists(DB_PATH) and not isMigrate:
+        # every change is written row by row into database, queries only read it
+        shared = SqliteData(DB_PATH, isReadOnly=isQuery)
     else:
-        if patient_file_size == 0:
-            print("Patient database empty.")
-        if room_file_size == 0:
-            print("Room database empty.")
-        if bed_file_size == 0:
-            print("Bed database empty.")
-        print("Please enter initial data first.")
+        patient_file_size = os.path.getsize(PATIENT_DB_PATH)
+        room_file_size = os.path.getsize(ROOM_DB_PATH)
+        bed_file_size = os.path.getsize(BED_DB_PATH)
+
+        if patient_file_size > 0 and room_file_size > 0 and bed_file_size > 0:
+            # other processes may use the same files, every change is appended into journal
+            # while holding lock of data files, queries hold a shared lock only to read
+            shared = SharedData(CSV_PATHS, JOURNAL_PATH, SNAPSHOT_PATH if USE_SNAPSHOT else None,
+                                isReadOnly=isQuery, max_bytes=MAX_LOAD_BYTES)
+        else:
+            if patient_file_size == 0:
+                print("Patient database empty.")
+            if room_file_size == 0:
+                print("Room database empty.")
+            if bed_file_size == 0:
+                print("Bed database empty.")
+            print("Please enter initial data first.")
+
+    if shared is not None and isMigrate:
+        run_migrate(shared, DB_PATH)
+        shared.close()
+    elif shared is not None and isQuery:
+        # room types are written with underscores, e.g. Kelas 1 as Kelas_1
+        room_type = '_'.join(room_type.split()) if room_type is not None else None
+        query = sys.argv[1:]
+        if query[0] == "patient":
+            # patient IDs are written as P-1, as in the menu
+            query[1] = query[1].strip().capitalize()
+        status = run_query(shared, query, room_type, isJson)
+        shared.close()
+        sys.exit(status)
+    elif shared is not None:
+        try:
+            with shared:
+                # load data, from snapshot if it is up to date with CSV files, and apply journal
+                patient_db, room_db, bed_db = shared.load()
+        except LoadLimitError as error:
+            print(error)
+            shared.close()
+            sys.exit(1)
+        store = AdmissionStore(patient_db, room_db, bed_db, shared=shared)
+        if isImport:
+            run_import(sys.argv[2])
+        elif isServe:
+            from server import serve
+            socket_path = sys.argv[2] if len(sys.argv) == 3 else os.path.join(CURRENT_DIR, "admission.sock")
+            serve(store, socket_path, COMPACT_SIZE)
+        else:
+            print('\n=== Welcome to JCDS Purwadhika Patient Admission Data System ===')
+            # run main program
+            main()
+        shared.close()
     
     # end program
-    sys.exit()
\ No newline at end of file
+    sys.exit()
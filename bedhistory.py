@@ -0,0 +1,180 @@
+from datetime import datetime, timezone, timedelta
+from array import array
+
+# timezone of each UTC offset in minutes, to avoid creating one for every timestamp formatted
+TIMEZONES = {}
+
+def parse_timestamp(timestamp):
+    '''
+    Function to convert timestamp string in format YYYY-MM-DDTHH:MM:SS+HH:MM into seconds since epoch
+    and UTC offset in minutes, timestamps without UTC offset are in local time
+
+    Args:
+        timestamp (str)
+
+    Returns:
+        int, int
+    '''
+    timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.astimezone()
+    return int(timestamp.timestamp()), int(timestamp.utcoffset().total_seconds()) // 60
+
+def format_timestamp(epoch, offset):
+    '''
+    Function to convert seconds since epoch and UTC offset in minutes
+    into timestamp string in format YYYY-MM-DDTHH:MM:SS+HH:MM
+
+    Args:
+        epoch (int)
+        offset (int)
+
+    Returns:
+        str
+    '''
+    tz = TIMEZONES.get(offset)
+    if tz is None:
+        tz = TIMEZONES[offset] = timezone(timedelta(minutes=offset))
+    return datetime.fromtimestamp(epoch, tz).isoformat()
+
+class BedHistory:
+    '''
+    Bed availability data stored column-wise in typed arrays.
+
+    Behaves like the list of dict it replaces: position 0 is column names,
+    position 1 is CAPACITY row, and the remaining positions are bed availability rows,
+    built as dict only when they are accessed. Timestamps are kept as epoch and UTC offset,
+    and formatted as strings only when rows are built.
+
+    Args:
+        headings (list): column names of bed availability data
+    '''
+    def __init__(self, headings):
+        self.headings = headings
+        self.capacity = None
+        # Index, epoch timestamp, and UTC offset in minutes of each row
+        self.index = array("q")
+        self.epoch = array("q")
+        self.offset = array("h")
+        # bed count of each room type
+        self.count = {key: array("i") for key in headings[2:]}
+
+    def __len__(self):
+        if self.capacity is None:
+            return 1
+        return 2 + len(self.index)
+
+    def append(self, row, epoch=None, offset=None):
+        '''
+        Function to add a row, the first row added must be CAPACITY row
+
+        Args:
+            row (dict): bed availability row
+            epoch (int or None): timestamp of row in seconds since epoch, None to parse it from row
+            offset (int or None): UTC offset of timestamp in minutes, given with epoch
+
+        Returns:
+            None
+        '''
+        if self.capacity is None:
+            self.capacity = dict(row)
+            return
+        if epoch is None:
+            epoch, offset = parse_timestamp(row["Timestamp"])
+        self.index.append(row["Index"])
+        self.epoch.append(epoch)
+        self.offset.append(offset)
+        for key, column in self.count.items():
+            column.append(row[key])
+
+    def append_values(self, values):
+        '''
+        Function to add a bed availability row (excluding CAPACITY) read from .csv file,
+        straight into typed columns without building a dict
+
+        Args:
+            values (list): Index, Timestamp, and bed count of each room type, as strings
+
+        Returns:
+            None
+        '''
+        if len(values) != len(self.headings):
+            raise ValueError(f"bed row has {len(values)} values, expected {len(self.headings)}")
+        epoch, offset = parse_timestamp(values[1])
+        self.index.append(int(values[0]))
+        self.epoch.append(epoch)
+        self.offset.append(offset)
+        for column, count in zip(self.count.values(), values[2:]):
+            column.append(int(count))
+
+    def load(self, other):
+        '''
+        Function to replace all rows with rows of another BedHistory, keeping this object
+
+        Args:
+            other (BedHistory)
+
+        Returns:
+            None
+        '''
+        self.headings = other.headings
+        self.capacity = other.capacity
+        self.index = other.index
+        self.epoch = other.epoch
+        self.offset = other.offset
+        self.count = other.count
+
+    def get_row(self, i):
+        '''
+        Function to build i-th bed availability row (excluding CAPACITY) as dict
+
+        Args:
+            i (int)
+
+        Returns:
+            dict
+        '''
+        row = {self.headings[0]: self.index[i],
+               self.headings[1]: format_timestamp(self.epoch[i], self.offset[i])}
+        for key, column in self.count.items():
+            row[key] = column[i]
+        return row
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if position < 0 or position >= len(self):
+            raise IndexError("bed history index out of range")
+        if position == 0:
+            return self.headings
+        if position == 1:
+            return dict(self.capacity)
+        return self.get_row(position - 2)
+
+    def __iter__(self):
+        yield self.headings
+        if self.capacity is not None:
+            yield dict(self.capacity)
+            for i in range(len(self.index)):
+                yield self.get_row(i)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def column(self, key):
+        '''
+        Function to get a column of bed availability rows (excluding CAPACITY) as array
+
+        Args:
+            key (str): column name, Epoch for epoch timestamps
+
+        Returns:
+            array
+        '''
+        if key == self.headings[0]:
+            return self.index
+        if key == "Epoch":
+            return self.epoch
+        return self.count[key]
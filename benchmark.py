@@ -0,0 +1,189 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from storage import load_patient, load_room, load_bed, dict_of_list_to_csv, list_of_dict_to_csv
+from store import load_index_database, isOngoingPatient, isDuplicateProfile
+from store import filter_data_header, filter_range_date, search_room_range, get_most_recent_bed_data
+from generate import generate_dataset
+
+SIZES = [10_000, 100_000, 1_000_000]
+# lookups timed per repeat, result is time per lookup
+N_LOOKUPS = 10_000
+# fastest timing slower than in baseline by more than this ratio is a regression,
+# fastest timing is compared as it is the least disturbed by other work on the machine
+THRESHOLD = 1.25
+
+def time_function(function, repeat, calls=1):
+    '''
+    Function to time a function with garbage collection turned off, as timeit does
+
+    Args:
+        function (callable): function without arguments, making calls calls of the benchmarked operation
+        repeat (int): number of timings
+        calls (int): number of operations in one call of function
+
+    Returns:
+        list: seconds per operation of each timing
+    '''
+    times = []
+    isEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append((time.perf_counter() - start) / calls)
+    finally:
+        if isEnabled:
+            gc.enable()
+    return times
+
+def add_result(results, name, n_rows, times, calls=1):
+    '''
+    Function to add timing summary of a benchmark into results, and print it
+
+    Args:
+        results (list): benchmark results, added in place
+        name (str): benchmark name
+        n_rows (int): dataset size
+        times (list): seconds per operation of each timing
+        calls (int): number of operations in one timing
+
+    Returns:
+        None
+    '''
+    result = {"name": name,
+              "rows": n_rows,
+              "repeat": len(times),
+              "calls": calls,
+              "min": min(times),
+              "median": statistics.median(times),
+              "mean": statistics.mean(times)}
+    results.append(result)
+    print(f"{name:28} {n_rows:>9} rows  median {result['median'] * 1000:12.4f} ms  min {result['min'] * 1000:12.4f} ms")
+
+def run_size(n_rows, repeat, seed=0):
+    '''
+    Function to run every benchmark on generated dataset of n_rows patients and n_rows admissions,
+    with around 2 * n_rows bed availability rows
+
+    Args:
+        n_rows (int)
+        repeat (int): number of timings of each benchmark
+        seed (int): seed of dataset and lookups
+
+    Returns:
+        list: benchmark results
+    '''
+    results = []
+    directory = tempfile.mkdtemp()
+    patient_path = os.path.join(directory, "patient_data.csv")
+    room_path = os.path.join(directory, "room_data.csv")
+    bed_path = os.path.join(directory, "bed_data.csv")
+
+    try:
+        generate_dataset(directory, n_rows, n_rows, seed=seed)
+        add_result(results, "load_patient", n_rows, time_function(lambda: load_patient(patient_path), repeat))
+        add_result(results, "load_room", n_rows, time_function(lambda: load_room(room_path), repeat))
+        add_result(results, "load_bed", n_rows, time_function(lambda: load_bed(bed_path), repeat))
+        patient_database, room_database, bed_database = (load_patient(patient_path), load_room(room_path),
+                                                         load_bed(bed_path))
+
+        add_result(results, "dict_of_list_to_csv patient", n_rows,
+                   time_function(lambda: dict_of_list_to_csv(patient_path, patient_database), repeat))
+        add_result(results, "list_of_dict_to_csv room", n_rows,
+                   time_function(lambda: list_of_dict_to_csv(room_path, room_database), repeat))
+        add_result(results, "list_of_dict_to_csv bed", n_rows,
+                   time_function(lambda: list_of_dict_to_csv(bed_path, bed_database), repeat))
+    finally:
+        shutil.rmtree(directory)
+
+    add_result(results, "load_index_database", n_rows,
+               time_function(lambda: load_index_database(patient_database, room_database, bed_database), repeat))
+    index_database = load_index_database(patient_database, room_database, bed_database)
+
+    rand = random.Random(seed)
+    patient_ids = rand.choices(list(patient_database)[1:], k=N_LOOKUPS)
+    profiles = [patient_database[patient_id][1:] for patient_id in patient_ids]
+    add_result(results, "isOngoingPatient", n_rows,
+               time_function(lambda: [isOngoingPatient(index_database, patient_id) for patient_id in patient_ids],
+                             repeat, N_LOOKUPS), N_LOOKUPS)
+    add_result(results, "isDuplicateProfile", n_rows,
+               time_function(lambda: [isDuplicateProfile(index_database, profile) for profile in profiles],
+                             repeat, N_LOOKUPS), N_LOOKUPS)
+    add_result(results, "get_most_recent_bed_data", n_rows,
+               time_function(lambda: [get_most_recent_bed_data(index_database) for _ in range(N_LOOKUPS)],
+                             repeat, N_LOOKUPS), N_LOOKUPS)
+
+    # filters run on rows as displayed by room menu
+    header = room_database[0]
+    data = [list(row.values()) for row in room_database[1:]]
+    add_result(results, "filter_data_header", n_rows,
+               time_function(lambda: filter_data_header(data, header, "Status", "ONGOING"), repeat))
+    add_result(results, "filter_range_date", n_rows,
+               time_function(lambda: filter_range_date(data, header, "Admission_Date", "2023-03-01", "2023-06-30"),
+                             repeat))
+    add_result(results, "search_room_range", n_rows,
+               time_function(lambda: search_room_range(room_database, "Admission_Date", "2023-03-01", "2023-06-30"),
+                             repeat))
+    return results
+
+def compare_results(results, baseline, threshold=THRESHOLD):
+    '''
+    Function to find benchmarks slower than in baseline
+
+    Args:
+        results (list): benchmark results
+        baseline (list): benchmark results of an earlier run
+        threshold (float): ratio of fastest timing to fastest timing of baseline counted as a regression
+
+    Returns:
+        list: description of each regression
+    '''
+    baseline_times = {(result["name"], result["rows"]): result["min"] for result in baseline}
+    regressions = []
+    for result in results:
+        old = baseline_times.get((result["name"], result["rows"]))
+        if old and result["min"] > old * threshold:
+            regressions.append(f"{result['name']} ({result['rows']} rows): {result['min'] / old:.2f}x slower")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time loaders, lookups, filters, and writers on generated data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="dataset sizes in rows")
+    parser.add_argument("--repeat", type=int, default=5, help="timings of each benchmark")
+    parser.add_argument("--output", default="benchmark.json", help="path to JSON results")
+    parser.add_argument("--compare", help="path to JSON results of an earlier run, exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="ratio of fastest timing to earlier fastest timing counted as a regression")
+    args = parser.parse_args()
+
+    results = []
+    for n_rows in args.sizes:
+        results += run_size(n_rows, args.repeat)
+
+    report = {"created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+              "python": platform.python_version(),
+              "platform": platform.platform(),
+              "unit": "seconds per operation",
+              "results": results}
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written into {args.output}.")
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare_results(results, json.load(file)["results"], args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+
+def get_percentile(values, percent):
+    '''
+    Function to get percentile of sorted values, using nearest rank
+
+    Args:
+        values (list): sorted values
+        percent (float): percentile between 0 and 100
+
+    Returns:
+        float
+    '''
+    if not values:
+        return 0.0
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+def make_request(rand, request_id, admitted):
+    '''
+    Function to make a random request: availability, lookup, admit, or discharge of an admitted patient
+
+    Args:
+        rand (random.Random)
+        request_id (int)
+        admitted (list): patient IDs admitted by this connection and not yet discharged
+
+    Returns:
+        dict
+    '''
+    choice = rand.random()
+    if choice < 0.4:
+        return {"id": request_id, "op": "availability"}
+    if choice < 0.6:
+        patient_id = rand.choice(admitted) if admitted else "P-1"
+        return {"id": request_id, "op": "lookup", "key": "Patient_ID", "value": patient_id}
+    if choice < 0.8 or not admitted:
+        profile = ["Load", f"Client {''.join(chr(97 + int(d)) for d in str(request_id))}", "Female", "1990-01-01"]
+        room_type = rand.choice(["VVIP", "VIP", "Kelas_1", "Kelas_2", "Kelas_3"])
+        return {"id": request_id, "op": "admit", "room_type": room_type, "profile": profile,
+                "allow_duplicate": True}
+    return {"id": request_id, "op": "discharge", "patient_id": admitted.pop(rand.randrange(len(admitted)))}
+
+async def run_connection(socket_path, seed, n_requests, pipeline, latencies, counts):
+    '''
+    Function to send random requests over one connection, keeping up to pipeline requests unanswered
+
+    Args:
+        socket_path (str): path to Unix domain socket of server
+        seed (int): seed of random requests
+        n_requests (int)
+        pipeline (int): maximum unanswered requests
+        latencies (list): latency of each request in seconds, added in place
+        counts (dict): number of ok and rejected responses, updated in place
+
+    Returns:
+        None
+    '''
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    rand = random.Random(seed)
+    window = asyncio.Semaphore(pipeline)
+    sent = {}
+    admitted = []
+
+    async def send_requests():
+        for i in range(n_requests):
+            await window.acquire()
+            request = make_request(rand, seed * n_requests + i, admitted)
+            sent[request["id"]] = (request["op"], time.perf_counter())
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+
+    async def receive_responses():
+        for _ in range(n_requests):
+            response = json.loads(await reader.readline())
+            op, start = sent.pop(response["id"])
+            latencies.append(time.perf_counter() - start)
+            counts["ok" if response["ok"] else "rejected"] += 1
+            if response["ok"] and op == "admit":
+                admitted.append(response["result"])
+            window.release()
+
+    await asyncio.gather(send_requests(), receive_responses())
+    # discharge patients still admitted, so repeated runs do not fill the rooms
+    for i, patient_id in enumerate(admitted):
+        writer.write(json.dumps({"id": -i - 1, "op": "discharge", "patient_id": patient_id}).encode() + b"\n")
+    await writer.drain()
+    for _ in admitted:
+        await reader.readline()
+    writer.close()
+    await writer.wait_closed()
+
+async def run_load(socket_path, n_connections, n_requests, pipeline):
+    '''
+    Function to run connections at the same time and report throughput and latency percentiles
+
+    Args:
+        socket_path (str): path to Unix domain socket of server
+        n_connections (int)
+        n_requests (int): requests per connection
+        pipeline (int): maximum unanswered requests per connection
+
+    Returns:
+        dict: report
+    '''
+    latencies = []
+    counts = {"ok": 0, "rejected": 0}
+    start = time.perf_counter()
+    await asyncio.gather(*[run_connection(socket_path, seed, n_requests, pipeline, latencies, counts)
+                           for seed in range(n_connections)])
+    duration = time.perf_counter() - start
+    latencies.sort()
+    return {"connections": n_connections,
+            "pipeline": pipeline,
+            "requests": len(latencies),
+            "ok": counts["ok"],
+            "rejected": counts["rejected"],
+            "seconds": round(duration, 3),
+            "requests_per_second": round(len(latencies) / duration),
+            "latency_ms": {f"p{percent}": round(get_percentile(latencies, percent) * 1000, 3)
+                           for percent in [50, 90, 99, 99.9, 100]}}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load client for python __main__.py serve")
+    parser.add_argument("socket", nargs="?", default="admission.sock", help="path to server socket")
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per connection")
+    parser.add_argument("--pipeline", type=int, default=16, help="maximum unanswered requests per connection")
+    args = parser.parse_args()
+    report = asyncio.run(run_load(args.socket, args.connections, args.requests, args.pipeline))
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,275 @@
+import argparse
+import csv
+import heapq
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+PATIENT_HEADINGS = ["Patient_ID", "First_Name", "Last_Name", "Gender", "Birth_Date"]
+ROOM_HEADINGS = ["Index", "Patient_ID", "Room_Type", "Admission_Date", "Discharge_Date", "Status"]
+BED_HEADINGS = ["Index", "Timestamp", "VVIP", "VIP", "Kelas_1", "Kelas_2", "Kelas_3"]
+# share of admissions and mean length of stay in days of each room type
+ROOM_MIX = {"VVIP": 0.04, "VIP": 0.08, "Kelas_1": 0.18, "Kelas_2": 0.30, "Kelas_3": 0.40}
+MEAN_STAY = {"VVIP": 3.5, "VIP": 4.0, "Kelas_1": 4.5, "Kelas_2": 5.0, "Kelas_3": 5.5}
+# spread of length of stay (sigma of log-normal distribution)
+STAY_SIGMA = 0.6
+# bed occupancy aimed at when capacity is not given
+OCCUPANCY = 0.85
+# local time of timestamps, as written by the application in Indonesia
+TIMEZONE = timezone(timedelta(hours=7))
+# bytes buffered by each output file
+BUFFER_SIZE = 1024 * 1024
+
+FIRST_NAMES = {"Male": ["Adi", "Aji", "Bayu", "Budi", "Dimas", "Eko", "Fajar", "Gilang", "Hendra", "Indra",
+                        "Joko", "Kurniawan", "Ramli", "Rizky", "Salahudin", "Satya", "Teguh", "Wahyu", "Yoga"],
+               "Female": ["Ayu", "Citra", "Debrina", "Dewi", "Embun", "Fitri", "Indah", "Iryana", "Kartika",
+                          "Lestari", "Maya", "Nadia", "Putri", "Rina", "Sari", "Sawitri", "Wulan", "Yuni"]}
+LAST_NAMES = ["Adi", "Firmansyah", "Gunawan", "Hakim", "Hidayat", "Jailani", "Kusuma", "Lubis", "Natsir",
+              "Nugroho", "Pratama", "Puspita", "Putri", "Safitri", "Saputra", "Setiawan", "Siregar",
+              "Usada", "Wibowo", "Wijaya"]
+
+def get_capacity(n_admissions, days):
+    '''
+    Function to get bed capacity of each room type, so beds are occupied around OCCUPANCY on average
+
+    Args:
+        n_admissions (int)
+        days (float): length of simulated time window
+
+    Returns:
+        dict: room type -> number of beds
+    '''
+    admissions_per_day = n_admissions / days
+    return {key: math.ceil(admissions_per_day * ROOM_MIX[key] * MEAN_STAY[key] / OCCUPANCY) + 1
+            for key in ROOM_MIX}
+
+def get_arrival_times(rand, n_admissions, start, seconds):
+    '''
+    Generator of admission times spread uniformly over a time window, in order, without keeping them all
+
+    Args:
+        rand (random.Random)
+        n_admissions (int)
+        start (float): epoch of start of time window
+        seconds (float): length of time window
+
+    Yields:
+        float: epoch of admission
+    '''
+    # each next smallest of the remaining uniform values, so values come sorted one at a time
+    fraction = 0.0
+    for remaining in range(n_admissions, 0, -1):
+        fraction = 1 - (1 - fraction) * rand.random() ** (1 / remaining)
+        yield start + fraction * seconds
+
+def get_length_of_stay(rand, room_type):
+    '''
+    Function to draw length of stay in seconds from a log-normal distribution with mean MEAN_STAY of room type
+
+    Args:
+        rand (random.Random)
+        room_type (str)
+
+    Returns:
+        float
+    '''
+    mu = math.log(MEAN_STAY[room_type]) - STAY_SIGMA ** 2 / 2
+    # at least an hour
+    return max(rand.lognormvariate(mu, STAY_SIGMA), 1 / 24) * 86400
+
+def get_room_type(rand, free_beds):
+    '''
+    Function to draw room type of an admission from ROOM_MIX, falling back to other room types with free beds
+
+    Args:
+        rand (random.Random)
+        free_beds (dict): room type -> number of free beds
+
+    Returns:
+        str or None: None if no bed is free
+    '''
+    room_type = rand.choices(list(ROOM_MIX), weights=list(ROOM_MIX.values()))[0]
+    if free_beds[room_type] > 0:
+        return room_type
+    available = [key for key in ROOM_MIX if free_beds[key] > 0]
+    if not available:
+        return None
+    return rand.choices(available, weights=[ROOM_MIX[key] for key in available])[0]
+
+def new_profile(rand, patient_number, admission):
+    '''
+    Function to create patient row of a new patient
+
+    Args:
+        rand (random.Random)
+        patient_number (int): number of patient ID
+        admission (datetime): time of first admission
+
+    Returns:
+        list
+    '''
+    gender = rand.choice(["Male", "Female"])
+    age_days = rand.randrange(365, 365 * 90)
+    birth_date = (admission - timedelta(days=age_days)).strftime("%Y-%m-%d")
+    return [f"P-{patient_number}", rand.choice(FIRST_NAMES[gender]), rand.choice(LAST_NAMES), gender, birth_date]
+
+def to_datetime(epoch):
+    '''
+    Function to convert epoch into local datetime of TIMEZONE
+
+    Args:
+        epoch (float)
+
+    Returns:
+        datetime
+    '''
+    return datetime.fromtimestamp(int(epoch), TIMEZONE)
+
+def generate_dataset(directory, n_patients, n_admissions, days=365, start_date="2023-01-01", seed=0,
+                     capacity=None):
+    '''
+    Function to write patient, room admission, and bed availability .csv files of a simulated hospital,
+    streaming rows to disk as admissions and discharges happen
+
+    Every admission and discharge within the time window adds a bed availability row,
+    so bed counts always equal CAPACITY minus ONGOING patients. Stays not ended by the end
+    of the window are left ONGOING. An admission finding no free bed at all is turned away.
+
+    Args:
+        directory (str): directory to write .csv files into
+        n_patients (int): number of distinct patients, at most n_admissions
+        n_admissions (int): number of admissions
+        days (float): length of simulated time window
+        start_date (str): start of time window (YYYY-MM-DD, local time)
+        seed (int): seed of random values, the same seed gives the same files
+        capacity (dict or None): room type -> number of beds, None to fit capacity to admissions
+
+    Returns:
+        dict: number of rows written and admissions turned away
+    '''
+    rand = random.Random(seed)
+    n_patients = min(n_patients, n_admissions)
+    capacity = capacity or get_capacity(n_admissions, days)
+    start = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=TIMEZONE).timestamp()
+    end = start + days * 86400
+    free_beds = dict(capacity)
+    # discharges not yet happened: (epoch, room type, patient number), and patient numbers of ONGOING patients
+    discharges = []
+    ongoing = set()
+    summary = {"patients": 0, "admissions": 0, "bed_rows": 0, "turned_away": 0}
+
+    paths = [os.path.join(directory, name) for name in ["patient_data.csv", "room_data.csv", "bed_data.csv"]]
+    # write into temporary files first so existing files are never left half written
+    files = [open(path + ".tmp", "w", newline='', buffering=BUFFER_SIZE) for path in paths]
+    patient_writer, room_writer, bed_writer = [csv.writer(file, delimiter=";") for file in files]
+    patient_writer.writerow(PATIENT_HEADINGS)
+    room_writer.writerow(ROOM_HEADINGS)
+    bed_writer.writerow(BED_HEADINGS)
+    bed_writer.writerow([0, "CAPACITY", *capacity.values()])
+
+    def write_bed(epoch):
+        summary["bed_rows"] += 1
+        bed_writer.writerow([summary["bed_rows"], to_datetime(epoch).isoformat(), *free_beds.values()])
+
+    def discharge_until(epoch):
+        while discharges and discharges[0][0] <= epoch:
+            discharge, room_type, patient_number = heapq.heappop(discharges)
+            free_beds[room_type] += 1
+            ongoing.discard(patient_number)
+            write_bed(discharge)
+
+    for i, arrival in enumerate(get_arrival_times(rand, n_admissions, start, end - start)):
+        discharge_until(arrival)
+        admission = to_datetime(arrival)
+        room_type = get_room_type(rand, free_beds)
+        if room_type is None:
+            summary["turned_away"] += 1
+            continue
+
+        # new patient while new patients remain for the remaining admissions, else a returning patient
+        remaining_new = n_patients - summary["patients"]
+        patient_number = None
+        if summary["patients"] and rand.random() >= remaining_new / (n_admissions - i):
+            for _ in range(10):
+                number = rand.randrange(1, summary["patients"] + 1)
+                if number not in ongoing:
+                    patient_number = number
+                    break
+        if patient_number is None:
+            if remaining_new <= 0:
+                summary["turned_away"] += 1
+                continue
+            summary["patients"] += 1
+            patient_number = summary["patients"]
+            patient_writer.writerow(new_profile(rand, patient_number, admission))
+
+        discharge = arrival + get_length_of_stay(rand, room_type)
+        if discharge <= end:
+            discharge_date, status = to_datetime(discharge).strftime("%Y-%m-%d"), "COMPLETED"
+            heapq.heappush(discharges, (discharge, room_type, patient_number))
+        else:
+            discharge_date, status = "N/A", "ONGOING"
+        room_writer.writerow([summary["admissions"], f"P-{patient_number}", room_type,
+                              admission.strftime("%Y-%m-%d"), discharge_date, status])
+        summary["admissions"] += 1
+        free_beds[room_type] -= 1
+        ongoing.add(patient_number)
+        write_bed(arrival)
+    discharge_until(end)
+
+    for file, path in zip(files, paths):
+        file.flush()
+        os.fsync(file.fileno())
+        file.close()
+        os.replace(path + ".tmp", path)
+    return summary
+
+def parse_capacity(text):
+    '''
+    Function to parse capacity argument, e.g. VVIP=5,VIP=10,Kelas_1=10,Kelas_2=20,Kelas_3=30
+
+    Args:
+        text (str)
+
+    Returns:
+        dict: room type -> number of beds
+    '''
+    capacity = {}
+    for item in text.split(","):
+        key, value = item.split("=")
+        capacity[key.strip()] = int(value)
+    if list(capacity) != list(ROOM_MIX):
+        raise argparse.ArgumentTypeError(f"capacity of {', '.join(ROOM_MIX)} is needed, in that order")
+    return capacity
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write simulated patient, room admission, and bed data files")
+    parser.add_argument("directory", help="directory to write .csv files into")
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--admissions", type=int, default=12_000)
+    parser.add_argument("--days", type=float, default=365, help="length of simulated time window")
+    parser.add_argument("--start", default="2023-01-01", help="start date of time window (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--capacity", type=parse_capacity,
+                        help="beds of each room type, e.g. VVIP=5,VIP=10,Kelas_1=10,Kelas_2=20,Kelas_3=30 "
+                             "(default: fitted to admissions)")
+    args = parser.parse_args()
+
+    # changes left in journal or database would be applied over the new files
+    journal_path = os.path.join(args.directory, "journal_data.csv")
+    if os.path.exists(os.path.join(args.directory, "admission.db")) or (
+            os.path.exists(journal_path) and os.path.getsize(journal_path) > 0):
+        print(f"{args.directory} has a journal or SQLite database. Please remove it first.")
+        sys.exit(1)
+
+    os.makedirs(args.directory, exist_ok=True)
+    begin = time.perf_counter()
+    summary = generate_dataset(args.directory, args.patients, args.admissions, args.days, args.start, args.seed,
+                               args.capacity)
+    duration = time.perf_counter() - begin
+    print(f"Wrote {summary['patients']} patients, {summary['admissions']} admissions, and "
+          f"{summary['bed_rows']} bed availability rows in {duration:.1f} s "
+          f"({summary['turned_away']} admissions turned away).")
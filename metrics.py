@@ -0,0 +1,201 @@
+from contextlib import contextmanager
+import functools
+import json
+import threading
+import time
+
+from snapshot import replacing_file
+
+# upper bounds in seconds of latency histogram buckets, menus include time spent by operator
+BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300]
+# prefix of metric names in Prometheus text format
+PREFIX = "admission"
+
+class Metrics:
+    '''
+    Call counts, errors, latency histograms, and rows scanned of each operation, recorded only when enabled.
+
+    Rows scanned by a call are added with add_rows while it runs, and are counted for every operation
+    running on the same thread, so a menu also counts rows scanned by the functions it calls.
+
+    Args:
+        buckets (list): upper bounds in seconds of latency histogram buckets
+    '''
+    def __init__(self, buckets=BUCKETS):
+        self.isEnabled = False
+        self.buckets = buckets
+        # operation name -> count, errors, seconds, rows, and count of each bucket (last bucket is +Inf)
+        self.operations = {}
+        # reentrant, as metrics may be written by a signal handler interrupting record on the same thread
+        self.lock = threading.RLock()
+        # operations running on each thread, innermost last
+        self.local = threading.local()
+
+    @contextmanager
+    def measure(self, name):
+        '''
+        Context to record one call of an operation
+        '''
+        if not self.isEnabled:
+            yield
+            return
+        running = self.local.__dict__.setdefault("running", [])
+        # rows scanned by this call
+        call = [0]
+        running.append(call)
+        isError = False
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            isError = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            running.pop()
+            self.record(name, seconds, call[0], isError)
+
+    def add_rows(self, count):
+        '''
+        Function to add rows scanned to operations running on this thread
+
+        Args:
+            count (int)
+
+        Returns:
+            None
+        '''
+        if not self.isEnabled:
+            return
+        for call in getattr(self.local, "running", []):
+            call[0] += count
+
+    def record(self, name, seconds, rows, isError):
+        '''
+        Function to add one call into metrics of an operation
+
+        Args:
+            name (str): operation name
+            seconds (float): latency of call
+            rows (int): rows scanned by call
+            isError (bool): True if call raised an error
+
+        Returns:
+            None
+        '''
+        # first bucket holding latency, or +Inf
+        bucket = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        with self.lock:
+            operation = self.operations.get(name)
+            if operation is None:
+                operation = {"count": 0, "errors": 0, "seconds": 0.0, "rows": 0,
+                             "buckets": [0] * (len(self.buckets) + 1)}
+                self.operations[name] = operation
+            operation["count"] += 1
+            operation["errors"] += isError
+            operation["seconds"] += seconds
+            operation["rows"] += rows
+            operation["buckets"][bucket] += 1
+
+    def to_dict(self):
+        '''
+        Function to get metrics of every operation, with cumulative bucket counts by upper bound
+
+        Args:
+            None
+
+        Returns:
+            dict
+        '''
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        result = {}
+        with self.lock:
+            for name, operation in sorted(self.operations.items()):
+                total = 0
+                cumulative = {}
+                for bound, count in zip(bounds, operation["buckets"]):
+                    total += count
+                    cumulative[bound] = total
+                result[name] = {"count": operation["count"],
+                                "errors": operation["errors"],
+                                "seconds": operation["seconds"],
+                                "rows_scanned": operation["rows"],
+                                "buckets": cumulative}
+        return result
+
+    def to_prometheus(self):
+        '''
+        Function to get metrics in Prometheus text format
+
+        Args:
+            None
+
+        Returns:
+            str
+        '''
+        operations = self.to_dict()
+        lines = [f"# HELP {PREFIX}_operation_seconds Latency of operations.",
+                 f"# TYPE {PREFIX}_operation_seconds histogram"]
+        for name, operation in operations.items():
+            for bound, count in operation["buckets"].items():
+                lines.append(f'{PREFIX}_operation_seconds_bucket{{operation="{name}",le="{bound}"}} {count}')
+            lines.append(f'{PREFIX}_operation_seconds_sum{{operation="{name}"}} {operation["seconds"]}')
+            lines.append(f'{PREFIX}_operation_seconds_count{{operation="{name}"}} {operation["count"]}')
+        for metric, key, help in [("operation_errors_total", "errors", "Operations ended by an error."),
+                                  ("rows_scanned_total", "rows_scanned", "Rows scanned by operations.")]:
+            lines.append(f"# HELP {PREFIX}_{metric} {help}")
+            lines.append(f"# TYPE {PREFIX}_{metric} counter")
+            for name, operation in operations.items():
+                lines.append(f'{PREFIX}_{metric}{{operation="{name}"}} {operation[key]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, FILE_PATH):
+        '''
+        Function to write metrics into file, as JSON if path ends with .json, else in Prometheus text format
+
+        Args:
+            FILE_PATH (str)
+
+        Returns:
+            None
+        '''
+        if FILE_PATH.endswith(".json"):
+            text = json.dumps(self.to_dict(), indent=2) + "\n"
+        else:
+            text = self.to_prometheus()
+        with replacing_file(FILE_PATH) as file:
+            file.write(text)
+
+METRICS = Metrics()
+
+def timed(name):
+    '''
+    Function to make a decorator recording calls of the decorated function as operation name
+
+    Args:
+        name (str): operation name
+
+    Returns:
+        function
+    '''
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not METRICS.isEnabled:
+                return function(*args, **kwargs)
+            with METRICS.measure(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def add_rows(count):
+    '''
+    Function to add rows scanned to operations running on this thread
+
+    Args:
+        count (int)
+
+    Returns:
+        None
+    '''
+    METRICS.add_rows(count)
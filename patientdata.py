@@ -1,106 +1,24 @@
-from datetime import datetime, timezone, timedelta
-from dateutil import parser
+from datetime import datetime, timedelta
+from itertools import islice
+from store import DATE_FORMAT, PATIENT_ID_FORMAT
+from store import AdmissionError
+from store import get_current_date_str, date_to_str, filter_data_header
+from store import isAlphaName, isDuplicateProfile, isNullProfile, isOngoingPatient
+from store import get_most_recent_bed_data, getValidName
+from store import search_bed_range, get_lowest_bed_data, search_bed_at, search_room_range
+from tableview import TableRenderer
+from metrics import timed, add_rows
 import pyinputplus as pyip
-import tabulate
 import re
 
-DATE_FORMAT = "%Y-%m-%d"
-PATIENT_ID_FORMAT = r"^P-[0-9]+$"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+# rows shown per page, and whether display menus show only the number of rows, changed in display settings
+DISPLAY_SETTINGS = {"page_size": 20, "isCountOnly": False}
+# table name -> renderer of all rows of that table, kept so displaying it again reuses earlier rendering
+RENDERERS = {}
 
 ### GENERAL FUNCTIONS ###
 
-def isEmptyDatabase(database):
-    '''
-    Function to check if database is empty, indicated by length < 2,
-    to handle cases where only database has only columns without entries
-
-    Args:
-        database (list of dict or dict of list)
-
-    Returns:
-        bool
-
-    '''
-    if len(database) < 2: return True
-    else: return False
-
-def get_current_datetime_str():
-    '''
-    Function to get current datetime as string in format YYYY-MM-DDTHH:MM:SS+HH:MM
-    with last +HH:MM as timezone indicator to UTC
-
-    Args:
-        None
-
-    Returns:
-        str
-    '''
-    return datetime.now(timezone.utc).astimezone().replace(microsecond=0).isoformat()
-
-def get_current_date_str():
-    '''
-    Function to get current date as string in format YYYY-MM-DD
-
-    Args:
-        None
-        
-    Returns:
-        str
-
-    '''
-    return datetime.today().strftime(DATE_FORMAT)
-
-def date_to_str(date):
-    '''
-    Function to convert date in datetime.date type to string in format DATE_FORMAT
-
-    Args:
-        date (datetime.date)
-    Returns:
-        str
-    '''
-    return date.strftime(DATE_FORMAT)
-
-def filter_data_header(data, header, key, val):
-    '''
-    Fungsi untuk memfilter data dengan mengambil data ketika val ada di dalam data
-
-    Args:
-        data (list)
-        header (list): column names of data
-        key (str): column name of val
-        val
-
-    Returns:
-        list
-
-    '''
-    # get index of key in header
-    index = header.index(key)
-    
-    # get row where row[index] = val for each row in data
-    filtered_data = list(filter(lambda row: row[index] == val, data))
-    return filtered_data
-
-def filter_range_date(data, header, key, start_date, end_date):
-    '''
-    Function to filter data based on range date (start date to end date)
-
-    Args:
-        data (list)
-        header (list): column names of data
-        key (str): column name of val
-        val
-
-    Returns:
-        list
-    '''
-    # get index of key in header
-    index = header.index(key)
-    # get row where start_date <= row[index] <= end_date for each row in data
-    filtered_data = list(filter(lambda row: row[index] >= start_date and row[index] <= end_date, data))
-    return filtered_data
-
 def get_dict_of_list_data_header(database):
     '''
     Function to separate database into data and header (column names of database)
@@ -109,27 +27,27 @@ def get_dict_of_list_data_header(database):
         database (dict of list)
 
     Returns:
-        list, list
+        iterator, list: rows read from database as they are displayed, and header
     '''
-    # convert values of database into list without the header row
-    data = list(database.values())[1:]
+    # values of database without the header row
+    data = islice(database.values(), 1, None)
     # get header row from db
     header = database['column']
     return data, header
 
-def display_dict_of_list(database):
+def display_dict_of_list(database, table=None):
     '''
     Function to display database
 
     Args:
         database (dict of list)
+        table (str or None): table name of database, to reuse rendering of earlier displays
         
     Returns:
         None
     '''
     data, header = get_dict_of_list_data_header(database)
-    print()
-    print(tabulate.tabulate(data, header, tablefmt="outline"))
+    display_data_header(data, header, total=len(database)-1, table=table)
 
 def get_list_of_dict_data_header(database):
     '''
@@ -139,56 +57,111 @@ def get_list_of_dict_data_header(database):
         database (list of dict)
 
     Returns:
-        list, list
+        iterator, list: rows built as they are displayed, and header
     '''
     # get ordered index
-    data = [[i]+ list(row.values())[1:] for i, row in enumerate(database[1:])]
+    data = ([i-1] + list(database[i].values())[1:] for i in range(1, len(database)))
     header = database[0]
     return data, header
 
-def display_list_of_dict(database):
+def display_list_of_dict(database, table=None):
     '''
     Function to display database
 
     Args:
         database (list of dict)
+        table (str or None): table name of database, to reuse rendering of earlier displays
 
     Returns:
         None
     '''
     data, header = get_list_of_dict_data_header(database)
-    print()
-    print(tabulate.tabulate(data, header, tablefmt="outline"))
+    display_data_header(data, header, total=len(database)-1, table=table)
 
-def display_data_header(data, header):
+def get_renderer(table, header):
     '''
-    Function to display data and header
+    Function to get renderer of all rows of a table, a new one if table is None or its header has changed
 
     Args:
-        data (list)
+        table (str or None): table name
+        header (list): column names of table
+
+    Returns:
+        TableRenderer
+    '''
+    if table is None:
+        return TableRenderer(header)
+    renderer = RENDERERS.get(table)
+    if renderer is None or renderer.header != [str(key) for key in header]:
+        renderer = TableRenderer(header)
+        RENDERERS[table] = renderer
+    return renderer
+
+def display_data_header(data, header, total=None, isCountOnly=False, table=None):
+    '''
+    Function to display data and header page by page, only rows of the page shown are read and rendered
+
+    Args:
+        data (iterable): rows of data
         header (list): column names of data
+        total (int or None): number of rows, None to count them when needed
+        isCountOnly (bool): True to display only number of rows
+        table (str or None): table name when data is all rows of a table in order,
+                             to reuse rendering of rows unchanged since last display
 
     Returns:
         None
     '''
-    print()
-    print(tabulate.tabulate(data, header, tablefmt="outline"))
-
-def display_ordered_data_header(data, header):
+    if total is None and hasattr(data, "__len__"):
+        total = len(data)
+    if isCountOnly:
+        if total is None:
+            total = sum(1 for _ in data)
+            add_rows(total)
+        print(f"\nNumber of rows: {total}")
+        return
+
+    renderer = get_renderer(table, header)
+    if total is not None:
+        renderer.truncate(total)
+    page_size = DISPLAY_SETTINGS["page_size"]
+    rows = iter(data)
+    page = list(islice(rows, page_size))
+    add_rows(len(page))
+    start = 0
+    while True:
+        print()
+        renderer.render(page, start)
+        # read next page ahead to know if there is one
+        next_page = list(islice(rows, page_size))
+        add_rows(len(next_page))
+        end = start + len(page)
+        if not next_page:
+            if start > 0:
+                print(f"Rows {start+1}-{end} of {end}.")
+            return
+        print(f"Rows {start+1}-{end}" + (f" of {total}." if total is not None else "."))
+        response = pyip.inputStr(prompt="Press Enter for next page, or q to stop: ", blank=True)
+        if response.strip().lower() == "q":
+            return
+        page = next_page
+        start = end
+
+def display_ordered_data_header(data, header, isCountOnly=False):
     '''
     Function to display data and header with indexed reordered
 
     Args:
         data (list)
         header (list): column names of data
+        isCountOnly (bool): True to display only number of rows
 
     Returns:
         None
     '''
     # reordering index
-    ordered_data = [[i] + row[1:] for i, row in enumerate(data)]
-    print()
-    print(tabulate.tabulate(ordered_data, header, tablefmt="outline"))
+    ordered_data = ([i] + row[1:] for i, row in enumerate(data))
+    display_data_header(ordered_data, header, total=len(data), isCountOnly=isCountOnly)
 
 def display_profile(patient_database, patient_id, title="=== Patient Profile ==="):
     '''
@@ -235,237 +208,6 @@ def display_selected_data(data, header, title):
             except:
                 print(f"{key:20} : {value}")
 
-def isAlphaName(name):
-    '''
-    Function to check if name (with white space characters allowed) is only alphabets
-
-    Args:
-        name (str): patient name
-
-    Returns:
-        bool
-    '''
-    return ''.join(name.split()).isalpha()
-    
-def isDuplicateProfile(database, profile):
-    '''
-    Function to check if patient profile already exists, used when adding new patients
-
-    Args:
-        database (dict of list): patient data
-        profile (list): list of first name, last name, gender, and birth date
-
-    Returns:
-        str
-    '''
-    key_match = ""
-    for key, value in database.items():
-        if key == 'column':
-            continue
-        # get key of matched profile
-        else:
-            if value[1:] == profile:
-                key_match = key
-    return key_match
-
-def isNullProfile(database, patient_id):
-    '''
-    Function to check if patient profile has been deleted given a patient ID
-
-    Args:
-        database (dict of list): patient data
-        patient_id (str)
-
-    Returns:
-        bool
-    '''
-    if database[patient_id][1:] == ["NULL", "NULL", "NULL", "NULL"]:
-        return True
-    else:
-        return False
-
-def isOngoingPatient(database, patient_id):
-    '''
-    Function to check if patient room status is ONGOING given a patient ID
-
-    Args:
-        database (list of dict): room admission data
-        patient_id (str)
-        
-    Returns:
-        bool
-    '''
-    data, header = get_list_of_dict_data_header(database)
-    # get patient ID data
-    filtered_id = filter_data_header(data, header, key="Patient_ID", val=patient_id)
-    filtered_status = []
-    # if patient ID data exists, get status data
-    if filtered_id:
-        filtered_status = filter_data_header(filtered_id, header, key="Status", val="ONGOING")
-    # return True if ONGOING status data exists
-    if filtered_status: return True
-    else: return False
-
-def get_most_recent_bed_data(database):
-    '''
-    Function to get most recent bed availability
-
-    Args:
-        database (list of dict): bed availability data
-
-    Returns:
-        list, list
-    '''    
-    # get bed data with most recent timestamp
-    data, header = get_list_of_dict_data_header(database)
-    data = data[-1]
-
-    if data[1] == "CAPACITY":
-        data[1] = get_current_datetime_str()
-    
-    return data, header
-    #return sorted(data, key=lambda x: x[1])[-1], header
-
-def isAvailableRoom(data, header, room_type):
-    '''
-    Function to check if room type is available
-
-    Args:
-        data (list): bed availability data
-        header (list): room types
-
-    Returns:
-        bool
-    '''
-    # get column index of room type
-    index = header.index(room_type)
-    # get bed count of room type
-    bed_count =  data[index]
-    # return True if bed_count of room_type > 0
-    if bed_count > 0: return True
-    else: return False
-
-def update_patient_database(database, data):
-    '''
-    Function to update patient data
-
-    Args:
-        database (dict of list): patient data
-        data (list): new patient data to be updated into database
-
-    Returns:
-        dict of list
-    '''
-    patient_id, first_name, last_name, gender, birth_date = data
-    database.update({
-        patient_id: [
-            patient_id,
-            first_name,
-            last_name,
-            gender,
-            birth_date
-        ]
-    })
-    return database
-
-def update_room_database(database, data):
-    '''
-    Function to update room admission data
-
-    Args:
-        database (list of dict): room admission data
-        data (list): new room admission data to be updated into database
-    
-    Returns:
-        list of dict
-    '''
-    headings = database[0]
-    patient_id, room_type, admission_date, discharge_date, status = data
-    new_data = {headings[0]: get_max_index(database)+1,
-                headings[1]: patient_id,
-                headings[2]: room_type,
-                headings[3]: admission_date,
-                headings[4]: discharge_date,
-                headings[5]: status}
-    database.append(new_data)
-    return database
-
-def update_bed_database(database, old_room_type, new_room_type):
-    '''
-    Function to update bed availability data
-
-    Args:
-        database (list of dict): bed availability data
-        old_room_type (str): room type check out
-        new_room_type (str): room type check in
-
-    Returns:
-        list of dict
-    '''
-    headings = database[0]
-    # assign copy of most recent data to new data
-    new_data = database[-1].copy()
-    # set index of new data
-    new_data[headings[0]] = get_max_index(database)+1
-    # set current timestamp
-    new_data[headings[1]] = get_current_datetime_str()
-    # if room type check out, add count by 1
-    if old_room_type:
-        new_data[old_room_type] += 1
-    # if room type check in, minus count by 1
-    if new_room_type:
-        new_data[new_room_type] -= 1
-    # add new data to database
-    database.append(new_data)
-    return database
-
-def get_max_index(database):
-    '''
-    Function to find largest index of database which uses index as primary key
-
-    Args:
-        database (list of dict): room admission data or bed availability data
-
-    Returns
-        int
-    '''
-    if isEmptyDatabase(database):
-        return 0
-    else:
-        return max([row["Index"] for row in database[1:]])
-
-def get_max_patient_id(database):
-    '''
-    Function to find largest patient ID number in database which uses patient ID as primary key
-
-    Args:
-        database (dict of list): patient data
-
-    Returns
-        int
-    '''
-    # patient ID format e.g. P-1
-    # get only number part in patient_ids
-    patient_ids = [int(val[2:]) for val in list(database.keys())[1:]]
-    return max(patient_ids)
-
-def getValidName(name):
-    '''
-    Function to make sure name is capitalized and separated by single spaces
-    
-    Args:
-        name (str)
-
-    Returns:
-        str
-    '''
-    if ' ' in name:
-        tmp = [item.capitalize() for item in name.split()]
-        name = ' '.join(tmp)
-    else:
-        name =  name.capitalize()
-    return name
-
 ### INPUT FUNCTIONS ###
 
 def input_patient_id():
@@ -552,6 +294,23 @@ def input_date(type):
         date = date_to_str(date)
     return date, isBreak
 
+def input_datetime(type):
+    '''
+    Function to get date and time input
+
+    Args:
+        type (str): datetime type to insert in prompt message
+
+    Returns:
+        datetime.datetime or str, bool
+    '''
+    isBreak = False
+    prompt = "\n" + f"Enter {type} date and time (YYYY-MM-DD HH:MM) or 0 to cancel: "
+    date = pyip.inputDatetime(prompt=prompt, formats=[DATETIME_FORMAT], allowRegexes=[r"^0$"])
+    if date == "0":
+        isBreak = True
+    return date, isBreak
+
 def input_room_type():
     '''
     Function to get room type input
@@ -610,43 +369,18 @@ def input_index_to_modify(len_database, type):
 
 ### FEATURE FUNCTIONS ###
 
-def update_total_patient(bed_database, total_patient):
-    '''
-    Function to update total patient
-
-    Args:
-        bed_database (list of dict): bed availability data
-        total_patient (dict): total patient data
-    
-    Returns:
-        dict
-    '''
-    total_patient["Total"] = 0
-    for key in total_patient:
-        if key == "Timestamp":
-            # get current timestamp
-            total_patient[key] = get_current_datetime_str()
-
-        elif key == "Total":
-            continue
-
-        else:    
-            # total patient = capacity - current bed count
-            total_patient[key] = bed_database[1][key] - bed_database[-1][key]
-            total_patient["Total"] += total_patient[key]
-    return total_patient
-
-def display_patient(database):
+@timed("display_patient")
+def display_patient(store):
     '''
     Function to run dislay patient data submenu
 
     Args:
-        database (dict of list): patient data
+        store (AdmissionStore)
 
     Returns:
         None
     '''
-    data, header = get_dict_of_list_data_header(database)
+    header = store.patient_database['column']
 
     while True:
         prompt = "\n=== Display Patient Menu ===\nDisplay by:\n"
@@ -663,7 +397,9 @@ def display_patient(database):
             break
 
         elif response == choices[0]:
-            display_data_header(data=data, header=header)
+            data, header = get_dict_of_list_data_header(store.patient_database)
+            display_data_header(data=data, header=header, total=len(store.patient_database)-1,
+                                isCountOnly=DISPLAY_SETTINGS["isCountOnly"], table="patient")
 
         else:
             isBreak = False
@@ -691,25 +427,27 @@ def display_patient(database):
                 if isBreak:
                     break
 
-                filtered_data = filter_data_header(data=data, header=header, key=search_key, val=search_val)
+                filtered_data = store.query(key=search_key, value=search_val)
                 if filtered_data:
-                    display_data_header(data=filtered_data, header=header)
+                    display_data_header(data=filtered_data, header=header,
+                                        isCountOnly=DISPLAY_SETTINGS["isCountOnly"])
                 else:
                     print(f"{response} {search_val} does not exist.")
                     continue
                 break
 
-def display_room(database):
+@timed("display_room")
+def display_room(store):
     '''
     Function to run display room data submenu
 
     Args:
-        database (list of dict): room admission data
+        store (AdmissionStore)
 
     Returns:
         None
     '''
-    data, header = get_list_of_dict_data_header(database)
+    header = store.room_database[0]
 
     while True:
         prompt = "\n=== Display Room Menu ===\nDisplay by:\n"
@@ -719,6 +457,8 @@ def display_room(database):
                    "Admission date",
                    "Discharge date",
                    "Status",
+                   "Admission date range",
+                   "Discharge date range",
                    "Return to previous menu"]
         response = pyip.inputMenu(prompt=prompt, choices=choices, numbered=True)
 
@@ -726,7 +466,36 @@ def display_room(database):
             break
 
         elif response == choices[0]:
-            display_data_header(data=data, header=header)
+            data, header = get_list_of_dict_data_header(store.room_database)
+            display_data_header(data=data, header=header, total=len(store.room_database)-1,
+                                isCountOnly=DISPLAY_SETTINGS["isCountOnly"], table="room")
+
+        elif response in choices[6:8]:
+            search_key = "Admission_Date" if response == choices[6] else "Discharge_Date"
+            while True:
+                start_date, isBreak = input_date(type="start")
+                if isBreak:
+                    break
+
+                end_date, isBreak = input_date(type="end")
+                if isBreak:
+                    break
+
+                if start_date > end_date:
+                    print("\nStart date must be before end date.")
+                    continue
+
+                # dates are compared as day numbers kept in rows since they were loaded
+                add_rows(len(store.room_database) - 1)
+                filtered_data = search_room_range(store.room_database, search_key, start_date, end_date)
+                if filtered_data:
+                    filtered_data = [row.values() for row in filtered_data]
+                    display_ordered_data_header(data=filtered_data, header=header,
+                                                isCountOnly=DISPLAY_SETTINGS["isCountOnly"])
+                else:
+                    print("\nData does not exist.")
+                    continue
+                break
         
         else:
             isBreak = False
@@ -754,38 +523,47 @@ def display_room(database):
                 if isBreak:
                     break
 
+                data, header = get_list_of_dict_data_header(store.room_database)
+                add_rows(len(store.room_database) - 1)
                 filtered_data = filter_data_header(data=data, header=header, key=search_key, val=search_val)
                 if filtered_data:
-                    display_ordered_data_header(data=filtered_data, header=header)
+                    display_ordered_data_header(data=filtered_data, header=header,
+                                                isCountOnly=DISPLAY_SETTINGS["isCountOnly"])
                 else:
                     print(f"{response} {search_val} does not exist in Room Admission data.")
                     continue
                 break
 
-def display_bed(database):
+@timed("display_bed")
+def display_bed(store):
     '''
     Function to run display bed data submenu
 
     Args:
-        database (list of dict): bed availability data
+        store (AdmissionStore)
 
     Returns:
         None
     '''
-    data, header = get_list_of_dict_data_header(database)
+    database = store.bed_database
+    index_database = store.index_database
+    header = database[0]
     while True:
         prompt = "\n=== Display Bed Menu ===\nDisplay by:\n"
         choices = ["All data",
                    "Most recent",
                    "Range date",
+                   "Point in time",
                    "Return to previous menu"]
         response = pyip.inputMenu(prompt=prompt, choices=choices, numbered=True)
 
         if response == choices[0]:
-            display_data_header(data=data, header=header)
+            data, header = get_list_of_dict_data_header(database)
+            display_data_header(data=data, header=header, total=len(database)-1,
+                                isCountOnly=DISPLAY_SETTINGS["isCountOnly"], table="bed")
 
         elif response == choices[1]:
-            most_recent_data, header = get_most_recent_bed_data(database)
+            most_recent_data, header = get_most_recent_bed_data(index_database)
             display_ordered_data_header(data=[most_recent_data], header=header)
 
         elif response == choices[2]:
@@ -798,28 +576,38 @@ def display_bed(database):
                 if isBreak:
                     break
                 
-                # convert start date into isoformat
-                start_date = parser.isoparse(start_date).astimezone().isoformat()
-                # set end date time to 23:59:59
-                end_date = parser.isoparse(end_date) + timedelta(days=1) - timedelta(seconds=1)
-                # convert end date into isoformat
-                end_date = end_date.astimezone().isoformat()
+                # convert start date at 00:00:00 local time into epoch
+                start_epoch = int(datetime.strptime(start_date, DATE_FORMAT).timestamp())
+                # set end date time to 23:59:59 local time
+                end_epoch = int((datetime.strptime(end_date, DATE_FORMAT) + timedelta(days=1)).timestamp()) - 1
 
-                if start_date > end_date:
+                if start_epoch > end_epoch:
                     print("\nStart date must be before end date.")
                     continue
                 
-                filtered_data = filter_range_date(data=data, header=header, key="Timestamp",
-                                                  start_date=start_date, end_date=end_date)
+                filtered_data = search_bed_range(database, index_database, start_epoch, end_epoch)
                 if filtered_data:
-                    display_ordered_data_header(filtered_data, header)
+                    filtered_data = [list(row.values()) for row in filtered_data]
+                    display_ordered_data_header(filtered_data, header, isCountOnly=DISPLAY_SETTINGS["isCountOnly"])
+                    lowest = get_lowest_bed_data(database, index_database, start_epoch, end_epoch)
+                    display_selected_data(list(lowest.values()), list(lowest.keys()),
+                                          title="=== Lowest Bed Availability ===")
                 else:
                     print("\nData does not exist.")
                     continue
                 break
+
+        elif response == choices[3]:
+            point_time, isBreak = input_datetime(type="point in time")
+            if not isBreak:
+                # naive datetime is in local time
+                row = search_bed_at(database, index_database, int(point_time.timestamp()))
+                display_ordered_data_header([list(row.values())], header)
+
         else:
             break
 
+@timed("display_total_patient")
 def display_total_patient(database):
     '''
     Function to display total patient data
@@ -841,19 +629,47 @@ def display_total_patient(database):
         except:
             print(f"{key:20} : {value}")
 
-def add_new_patient(patient_database, room_database, bed_database, room_type):
+def display_settings():
+    '''
+    Function to run display settings submenu, to change rows per page and count only display
+
+    Args:
+        None
+
+    Returns:
+        None
+    '''
+    while True:
+        prompt = "\n=== Display Settings ===\nPlease select one of the following:\n"
+        choices = [f"Rows per page ({DISPLAY_SETTINGS['page_size']})",
+                   f"Count only ({'on' if DISPLAY_SETTINGS['isCountOnly'] else 'off'})",
+                   "Return to previous menu"]
+        response = pyip.inputMenu(prompt=prompt, choices=choices, numbered=True)
+
+        if response == choices[0]:
+            DISPLAY_SETTINGS["page_size"] = pyip.inputInt(prompt="Enter rows per page: ", min=1)
+
+        elif response == choices[1]:
+            prompt = "Display only number of rows? (yes/no): "
+            DISPLAY_SETTINGS["isCountOnly"] = pyip.inputYesNo(prompt=prompt) == "yes"
+
+        else:
+            break
+
+@timed("add_new_patient")
+def add_new_patient(store, room_type):
     '''
     Function to run add new patient submenu
 
     Args:
-        patient_database (dict of list): patient data
-        room_database (list of dict): room admission data
-        bed_database (list of dict): bed availability data
+        store (AdmissionStore)
         room_type (str): chosen room type for patient to be admitted to
 
     Returns:
         None
     '''
+    patient_database = store.patient_database
+    room_database = store.room_database
     isBreak = False
     while True:
         first_name, isBreak = input_name(type="first")
@@ -873,7 +689,7 @@ def add_new_patient(patient_database, room_database, bed_database, room_type):
             break
         
         profile = [first_name, last_name, gender, birth_date]
-        key_match = isDuplicateProfile(patient_database, profile)
+        key_match = isDuplicateProfile(store.index_database, profile)
         if key_match:
             print(f"\nPatient profile already exists under Patient ID {key_match}.")
             display_profile(patient_database=patient_database, patient_id=key_match)
@@ -883,7 +699,8 @@ def add_new_patient(patient_database, room_database, bed_database, room_type):
                 print("Please add new visit instead.")
                 break
             
-        patient_id = f"P-{get_max_patient_id(patient_database) + 1}"
+        # patient ID is only allocated once changes are confirmed
+        patient_id = store.get_next_patient_id()
         patient_data = [patient_id] + profile
 
         admission_date = get_current_date_str()
@@ -896,32 +713,32 @@ def add_new_patient(patient_database, room_database, bed_database, room_type):
         display_selected_data(tmp_data, tmp_header, title="=== New Patient ===")
 
         confirmation = pyip.inputYesNo(prompt="\nConfirm changes? (yes/no): ")
-        if confirmation == "yes":            
-            patient_database = update_patient_database(patient_database, patient_data)            
-            room_database = update_room_database(room_database, room_data)            
-            bed_database = update_bed_database(database=bed_database,
-                                               new_room_type= room_type,
-                                               old_room_type=None)
-            
+        if confirmation == "yes":
+            try:
+                store.admit(room_type, profile=profile, allow_duplicate=True)
+            except AdmissionError as error:
+                print(error)
+                break
             print("Data successfully saved.")
         else:
             print("Data not saved.")
 
         break
 
-def add_returning_patient(patient_database, room_database, bed_database, room_type):
+@timed("add_returning_patient")
+def add_returning_patient(store, room_type):
     '''
     Function to run add returning patient submenu
 
     Args:
-        patient_database (dict of list): patient data
-        room_database (list of dict): room admission data
-        bed_database (list of dict): bed availability data
+        store (AdmissionStore)
         room_type (str): chosen room type for patient to be admitted to
 
     Returns:
         None
     '''
+    patient_database = store.patient_database
+    room_database = store.room_database
     isBreak = False
     while True:
         patient_id, isBreak = input_patient_id()
@@ -936,7 +753,7 @@ def add_returning_patient(patient_database, room_database, bed_database, room_ty
             print(f"{patient_id} is a deleted patient ID.")
             continue
 
-        if isOngoingPatient(room_database, patient_id):
+        if isOngoingPatient(store.index_database, patient_id):
             print(f"Cannot add new visit for ONGOING patient.")
             continue
         
@@ -955,27 +772,30 @@ def add_returning_patient(patient_database, room_database, bed_database, room_ty
         display_selected_data(tmp_data, tmp_header, title="=== New Visit ===")
         
         confirmation = pyip.inputYesNo(prompt="\nConfirm changes? (yes/no): ")
-        if confirmation == "yes":       
-            room_database = update_room_database(room_database, room_data)            
-            bed_database = update_bed_database(database=bed_database,
-                                               new_room_type=room_type,
-                                               old_room_type=None)
+        if confirmation == "yes":
+            try:
+                store.admit(room_type, patient_id=patient_id)
+            except AdmissionError as error:
+                print(error)
+                break
             print("Data successfully saved.")
         else:
             print("Data not saved.")
         
         break    
     
-def modify_patient(patient_database):
+@timed("modify_patient")
+def modify_patient(store):
     '''
     Function to run modify patient data submenu
 
     Args:
-        patient_database (dict of list): patient data
+        store (AdmissionStore)
 
     Returns:
         None
     '''
+    patient_database = store.patient_database
     isBreak = False
     while True:
         patient_id, isBreak = input_patient_id()
@@ -1036,24 +856,29 @@ def modify_patient(patient_database):
 
                     confirmation = pyip.inputYesNo(prompt="\nConfirm changes? (yes/no): ")
                     if confirmation == "yes":
-                        patient_database[patient_id][key_index] = new_value
+                        try:
+                            store.modify(patient_id, key, new_value)
+                        except AdmissionError as error:
+                            print(error)
+                            break
                         print("Data succesfully saved.")
                     else:
                         print("Data not saved.")
 
                     break
 
-def modify_room(room_database, bed_database):
+@timed("modify_room")
+def modify_room(store):
     '''
     Function to run modify room data submenu
 
     Args:
-        room_database (list of dict): room admission data
-        bed_database (list of dict): bed availability data
+        store (AdmissionStore)
 
     Returns:
         None
     '''
+    room_database = store.room_database
     isBreak = False
     while True:
         prompt = "\nPlease select one of the following:\n"
@@ -1066,7 +891,7 @@ def modify_room(room_database, bed_database):
             break
         else:
             while True:
-                display_list_of_dict(room_database)
+                display_list_of_dict(room_database, table="room")
                 if response == choices[0]:
                     index, isBreak = input_index_to_modify(len_database=len(room_database), type="mark as completed")
                     
@@ -1092,12 +917,13 @@ def modify_room(room_database, bed_database):
 
                     confirmation = pyip.inputYesNo(prompt="\nConfirm changes? (yes/no): ")
                     if confirmation == "yes":
-                        room_type = room_database[index]["Room_Type"]
-                        room_database[index]["Discharge_Date"] = current_date
-                        room_database[index]["Status"] = new_status
-                        bed_database = update_bed_database(database=bed_database, old_room_type=room_type, new_room_type=None)
+                        try:
+                            store.discharge(room_database[index]["Patient_ID"])
+                        except AdmissionError as error:
+                            print(error)
+                            break
                         print("Data successfully saved.")
-                        display_list_of_dict(room_database)
+                        display_list_of_dict(room_database, table="room")
 
                     else:
                         print("Data not saved.")
@@ -1135,33 +961,35 @@ def modify_room(room_database, bed_database):
 
                     confirmation = pyip.inputYesNo(prompt="\nConfirm changes? (yes/no): ")
                     if confirmation == "yes":
-                        old_room_type = room_database[index]["Room_Type"]
-                        room_database[index]["Room_Type"] = new_room_type
-                        update_bed_database(database=bed_database,
-                                            old_room_type=old_room_type,
-                                            new_room_type=new_room_type)
+                        try:
+                            store.transfer(room_database[index]["Patient_ID"], new_room_type)
+                        except AdmissionError as error:
+                            print(error)
+                            break
                         print("Data successfully saved.")
-                        display_list_of_dict(room_database)
+                        display_list_of_dict(room_database, table="room")
 
                     else:
                         print("Data not saved.")
                     
                     break
 
-def delete_patient(patient_database, room_database):
+@timed("delete_patient")
+def delete_patient(store):
     '''
     Function to run delete patient data submenu
 
     Args:
-        patient_database (dict of list): patient data
-        room_database (list of dict): room admission data
+        store (AdmissionStore)
 
     Returns:
         None
     '''
+    patient_database = store.patient_database
+    room_database = store.room_database
     isBreak = False
     while True:
-        display_dict_of_list(database=patient_database)
+        display_dict_of_list(database=patient_database, table="patient")
         patient_id, isBreak = input_patient_id()
         
         if isBreak:
@@ -1175,24 +1003,24 @@ def delete_patient(patient_database, room_database):
             print(f"Patient ID {patient_id} is already deleted.")
             continue
 
-        if isOngoingPatient(room_database, patient_id):
+        if isOngoingPatient(store.index_database, patient_id):
             print("Cannot delete ONGOING patient. Please mark status as COMPLETED first.")
             continue
         
         display_profile(patient_database, patient_id)
         confirmation = pyip.inputYesNo(prompt="\nConfirm deletion? (yes/no): ")
         if confirmation == "yes":
-            new_data = [patient_id, "NULL", "NULL", "NULL", "NULL"]
-            patient_database = update_patient_database(patient_database, new_data)
+            try:
+                positions = store.delete(patient_id)
+            except AdmissionError as error:
+                print(error)
+                break
 
             print("Data successfully deleted.")
-            display_dict_of_list(database=patient_database)
-
-            for row in room_database[1:]:
-                if row["Patient_ID"] == patient_id:
-                    row["Status"] = "NULL"
-                    display_list_of_dict(database=room_database)
+            display_dict_of_list(database=patient_database, table="patient")
+            if positions:
+                display_list_of_dict(database=room_database, table="room")
         else:
             print("Deletion canceled.")
         
-        break
\ No newline at end of file
+        break
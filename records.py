@@ -0,0 +1,162 @@
+import sys
+import functools
+from datetime import date
+
+# distinct dates remembered by date_to_day, around 11 years of dates
+DAY_CACHE_SIZE = 4096
+
+def intern_value(value):
+    '''
+    Function to intern string values, so values repeated across rows
+    (patient ID, room type, status, gender, dates, N/A, NULL) are stored once
+
+    Args:
+        value
+
+    Returns:
+        same type as value
+    '''
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+@functools.lru_cache(maxsize=DAY_CACHE_SIZE)
+def date_to_day(text):
+    '''
+    Function to convert date string in format YYYY-MM-DD into ordinal day number,
+    so dates can be compared as integers
+
+    Args:
+        text (str)
+
+    Returns:
+        int or None: None if text is not a date, e.g. N/A
+    '''
+    try:
+        return date.fromisoformat(text).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+class PatientRecord:
+    '''
+    Patient row stored in slots instead of a list.
+
+    Supports the list operations used on patient rows: row[i], row[i:j], row[i] = value,
+    iteration, len(), concatenation with a list, and copy().
+
+    Args:
+        patient_id (str)
+        first_name (str)
+        last_name (str)
+        gender (str)
+        birth_date (str)
+    '''
+    __slots__ = ("Patient_ID", "First_Name", "Last_Name", "Gender", "Birth_Date")
+
+    def __init__(self, patient_id, first_name, last_name, gender, birth_date):
+        self.Patient_ID = intern_value(patient_id)
+        self.First_Name = intern_value(first_name)
+        self.Last_Name = intern_value(last_name)
+        self.Gender = intern_value(gender)
+        self.Birth_Date = intern_value(birth_date)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [getattr(self, key) for key in self.__slots__[i]]
+        return getattr(self, self.__slots__[i])
+
+    def __setitem__(self, i, value):
+        setattr(self, self.__slots__[i], intern_value(value))
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __iter__(self):
+        for key in self.__slots__:
+            yield getattr(self, key)
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def copy(self):
+        return PatientRecord(*self)
+
+class RoomRecord:
+    '''
+    Room admission row stored in slots instead of a dict.
+
+    Supports the dict operations used on room admission rows: row[key], row[key] = value,
+    keys(), values(), items(), and copy(). Admission and discharge dates are also kept
+    as ordinal day numbers (None for N/A) in admission_day and discharge_day, which are not columns.
+
+    Args:
+        index (int)
+        patient_id (str)
+        room_type (str)
+        admission_date (str)
+        discharge_date (str)
+        status (str)
+    '''
+    COLUMNS = ("Index", "Patient_ID", "Room_Type", "Admission_Date", "Discharge_Date", "Status")
+    __slots__ = COLUMNS + ("admission_day", "discharge_day")
+
+    def __init__(self, index, patient_id, room_type, admission_date, discharge_date, status):
+        self.Index = index
+        self.Patient_ID = intern_value(patient_id)
+        self.Room_Type = intern_value(room_type)
+        self.Admission_Date = intern_value(admission_date)
+        self.Discharge_Date = intern_value(discharge_date)
+        self.Status = intern_value(status)
+        self.admission_day = date_to_day(self.Admission_Date)
+        self.discharge_day = date_to_day(self.Discharge_Date)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self.COLUMNS:
+            raise KeyError(key)
+        setattr(self, key, intern_value(value))
+        if key == "Admission_Date":
+            self.admission_day = date_to_day(self.Admission_Date)
+        elif key == "Discharge_Date":
+            self.discharge_day = date_to_day(self.Discharge_Date)
+
+    def __iter__(self):
+        return iter(self.COLUMNS)
+
+    def __len__(self):
+        return len(self.COLUMNS)
+
+    def __eq__(self, other):
+        try:
+            return dict(self.items()) == dict(other.items())
+        except AttributeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def keys(self):
+        return list(self.COLUMNS)
+
+    def values(self):
+        return [getattr(self, key) for key in self.COLUMNS]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.COLUMNS]
+
+    def copy(self):
+        return RoomRecord(*self.values())
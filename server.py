@@ -0,0 +1,182 @@
+import asyncio
+import json
+import os
+import signal
+
+from store import AdmissionError
+from metrics import METRICS
+
+# maximum bytes read from a connection at a time, every complete request in it is run as one batch
+READ_SIZE = 64 * 1024
+# maximum bytes of one request line, a connection sending a longer line is closed
+MAX_LINE_SIZE = 1024 * 1024
+# operations of requests, each with its own metrics
+OPERATIONS = ["admit", "discharge", "transfer", "lookup", "availability", "census", "metrics"]
+
+def get_row_dict(row, header):
+    '''
+    Function to convert patient row or room admission row into dict to be sent as JSON
+
+    Args:
+        row (PatientRecord or RoomRecord)
+        header (list): column names of patient data, used for patient rows
+
+    Returns:
+        dict
+    '''
+    if hasattr(row, "items"):
+        return dict(row.items())
+    return dict(zip(header, row))
+
+def run_request(store, request):
+    '''
+    Function to run one request on store
+
+    Args:
+        store (AdmissionStore)
+        request (dict): op (admit, discharge, transfer, lookup, availability, census, or metrics)
+            and its arguments
+
+    Returns:
+        JSON serializable result of operation
+    '''
+    op = request.get("op")
+    room_type = '_'.join(str(request.get("room_type") or "").split())
+    header = store.patient_database['column']
+
+    if op == "admit":
+        return store.admit(room_type, patient_id=request.get("patient_id"), profile=request.get("profile"),
+                           allow_duplicate=bool(request.get("allow_duplicate")))
+    elif op == "discharge":
+        return get_row_dict(store.discharge(request.get("patient_id")), header)
+    elif op == "transfer":
+        return get_row_dict(store.transfer(request.get("patient_id"), room_type), header)
+    elif op == "lookup":
+        rows = store.query(request.get("key", "Patient_ID"), request.get("value"), request.get("table", "patient"))
+        return [get_row_dict(row, header) for row in rows]
+    elif op == "availability":
+        return store.availability()
+    elif op == "census":
+        return store.census()
+    elif op == "metrics":
+        return METRICS.to_dict()
+    raise AdmissionError(f"Unknown operation {op!r}.")
+
+def run_batch(store, lines):
+    '''
+    Function to run requests received together, with journal written to disk once for all of them
+
+    Args:
+        store (AdmissionStore)
+        lines (list of bytes): JSON requests, one per line
+
+    Returns:
+        bytes: JSON responses, one per line in the same order as requests
+    '''
+    responses = []
+    # changes of other processes are read once per batch
+    store.refresh()
+    with store.batch():
+        for line in lines:
+            if not line.strip():
+                continue
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get("id")
+                # unknown operations are counted together, so clients cannot add metrics
+                op = request.get("op")
+                name = f"request_{op}" if op in OPERATIONS else "request_unknown"
+                with METRICS.measure(name):
+                    result = run_request(store, request)
+                response = {"id": request_id, "ok": True, "result": result}
+            except Exception as error:
+                # any failed request is answered, so other requests of its batch and connection are kept
+                response = {"id": request_id, "ok": False, "error": str(error) or type(error).__name__}
+            responses.append(json.dumps(response))
+    return ("\n".join(responses) + "\n").encode() if responses else b""
+
+async def handle_connection(store, compact_size, reader, writer):
+    '''
+    Function to answer requests of one connection, pipelined requests are run in batches
+
+    Args:
+        store (AdmissionStore)
+        compact_size (int): journal size in bytes before it is written into base files
+        reader (asyncio.StreamReader)
+        writer (asyncio.StreamWriter)
+
+    Returns:
+        None
+    '''
+    loop = asyncio.get_running_loop()
+    buffer = b""
+    try:
+        while True:
+            data = await reader.read(READ_SIZE)
+            if not data:
+                break
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            if lines:
+                # store operations block on locks and disk, so they run outside event loop
+                response = await loop.run_in_executor(None, run_batch, store, lines)
+                writer.write(response)
+                await writer.drain()
+                # journal size is checked by compact under lock, as executor threads use the same data files
+                if store.shared:
+                    await loop.run_in_executor(None, store.compact, compact_size)
+            # an unfinished line is kept in memory, so its size is capped
+            if len(buffer) > MAX_LINE_SIZE:
+                error = {"id": None, "ok": False, "error": f"Request line is longer than {MAX_LINE_SIZE} bytes."}
+                writer.write(json.dumps(error).encode() + b"\n")
+                await writer.drain()
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def run_server(store, socket_path, compact_size):
+    '''
+    Function to serve store over Unix domain socket until cancelled or terminated
+
+    Args:
+        store (AdmissionStore)
+        socket_path (str): path to Unix domain socket
+        compact_size (int): journal size in bytes before it is written into base files
+
+    Returns:
+        None
+    '''
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: handle_connection(store, compact_size, reader, writer), path=socket_path)
+    print(f"Serving on {socket_path}")
+    stop = asyncio.Event()
+    if hasattr(signal, "SIGTERM"):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        os.remove(socket_path)
+
+def serve(store, socket_path, compact_size):
+    '''
+    Function to run server, stopped by Ctrl+C or SIGTERM
+
+    Args:
+        store (AdmissionStore)
+        socket_path (str): path to Unix domain socket
+        compact_size (int): journal size in bytes before it is written into base files
+
+    Returns:
+        None
+    '''
+    try:
+        asyncio.run(run_server(store, socket_path, compact_size))
+    except KeyboardInterrupt:
+        pass
+    print("Server stopped.")
@@ -0,0 +1,233 @@
+from array import array
+from bedhistory import BedHistory
+from records import PatientRecord, RoomRecord
+from itertools import starmap
+from contextlib import contextmanager
+import os
+import struct
+import zlib
+
+SNAPSHOT_MAGIC = b"PADS"
+SNAPSHOT_VERSION = 2
+# magic, version, checksum of body
+HEADER_FORMAT = "<4sHI"
+# separator of values in string columns, not allowed in any field
+STRING_SEPARATOR = "\x1f"
+
+# column types of each table, array typecode for numbers and "s" for string
+PATIENT_TYPES = "sssss"
+ROOM_TYPES = "qsssss"
+BED_CAPACITY_TYPES = "qsqqqqq"
+# bed availability rows are stored as columns of BedHistory:
+# Index, Epoch, Offset, and bed count of each room type
+BED_HISTORY_TYPES = "qqhiiiii"
+
+def get_file_stat(FILE_PATH):
+    '''
+    Function to get size and modification time of a file, used to check if snapshot is stale
+
+    Args:
+        FILE_PATH (str)
+
+    Returns:
+        tuple: size in bytes and modification time in nanoseconds
+    '''
+    stat = os.stat(FILE_PATH)
+    return stat.st_size, stat.st_mtime_ns
+
+@contextmanager
+def replacing_file(FILE_PATH, mode="w", newline=None):
+    '''
+    Context to write a file as a whole, opening a temporary file next to it which is written to disk
+    and replaces the file only once the block has finished, so the file is never left half written
+    and readers see either the old or the new content
+
+    Args:
+        FILE_PATH (str)
+        mode (str): "w" for text or "wb" for bytes
+        newline (str or None): newline argument of open for text files
+
+    Yields:
+        file: temporary file to write into
+    '''
+    file = open(FILE_PATH + ".tmp", mode, newline=newline)
+    try:
+        yield file
+        file.flush()
+        os.fsync(file.fileno())
+    finally:
+        file.close()
+    os.replace(FILE_PATH + ".tmp", FILE_PATH)
+
+def pack_column(values, type):
+    '''
+    Function to convert a column into bytes
+
+    Args:
+        values (list or array): column values
+        type (str): column type, array typecode or "s"
+
+    Returns:
+        bytes
+    '''
+    if type == "s":
+        data = STRING_SEPARATOR.join(values).encode()
+    elif isinstance(values, array) and values.typecode == type:
+        data = values.tobytes()
+    else:
+        data = array(type, values).tobytes()
+    return struct.pack("<cQ", type.encode(), len(data)) + data
+
+def unpack_column(buffer, offset, n_rows):
+    '''
+    Function to read a column from bytes
+
+    Args:
+        buffer (bytes)
+        offset (int): position of column in buffer
+        n_rows (int): number of values in column
+
+    Returns:
+        list or array, int: column values and position after column
+    '''
+    type, size = struct.unpack_from("<cQ", buffer, offset)
+    offset += struct.calcsize("<cQ")
+    data = buffer[offset:offset+size]
+    if type != b"s":
+        values = array(type.decode())
+        values.frombytes(data)
+    elif n_rows == 0:
+        values = []
+    else:
+        values = bytes(data).decode().split(STRING_SEPARATOR)
+    return values, offset + size
+
+def pack_table(headings, columns, types):
+    '''
+    Function to convert a table stored as columns into bytes
+
+    Args:
+        headings (list): column names
+        columns (list of list or array): column values
+        types (str): column types
+
+    Returns:
+        bytes
+    '''
+    n_rows = len(columns[0]) if columns else 0
+    parts = [struct.pack("<QH", n_rows, len(headings)), pack_column(headings, "s")]
+    for values, type in zip(columns, types):
+        parts.append(pack_column(values, type))
+    return b"".join(parts)
+
+def unpack_table(buffer, offset):
+    '''
+    Function to read a table stored as columns from bytes
+
+    Args:
+        buffer (bytes)
+        offset (int): position of table in buffer
+
+    Returns:
+        list, list of list or array, int: column names, column values, and position after table
+    '''
+    n_rows, n_cols = struct.unpack_from("<QH", buffer, offset)
+    offset += struct.calcsize("<QH")
+    headings, offset = unpack_column(buffer, offset, n_cols)
+    columns = []
+    for _ in range(n_cols):
+        values, offset = unpack_column(buffer, offset, n_rows)
+        columns.append(values)
+    return headings, columns, offset
+
+def write_snapshot(FILE_PATH, csv_paths, patient_database, room_database, bed_database):
+    '''
+    Function to write all data into a binary snapshot file, next to base .csv files
+
+    Args:
+        FILE_PATH (str): path to snapshot file
+        csv_paths (list): paths to patient, room admission, and bed availability .csv files
+        patient_database (dict of list): patient data
+        room_database (list of dict): room admission data
+        bed_database (BedHistory): bed availability data
+
+    Returns:
+        None
+    '''
+    parts = []
+    # stat of base files, snapshot is stale once any of them changes
+    for csv_path in csv_paths:
+        parts.append(struct.pack("<QQ", *get_file_stat(csv_path)))
+
+    patient_rows = list(patient_database.values())[1:]
+    parts.append(pack_table(patient_database['column'],
+                            [list(column) for column in zip(*patient_rows)] or [[]] * 5,
+                            PATIENT_TYPES))
+    headings = room_database[0]
+    columns = [[row[key] for row in room_database[1:]] for key in headings]
+    parts.append(pack_table(headings, columns, ROOM_TYPES))
+
+    headings = bed_database.headings
+    capacity = bed_database.capacity
+    parts.append(pack_table(headings, [[capacity[key]] for key in headings], BED_CAPACITY_TYPES))
+    columns = [bed_database.index, bed_database.epoch, bed_database.offset]
+    columns += [bed_database.count[key] for key in headings[2:]]
+    parts.append(pack_table(["Index", "Epoch", "Offset"] + headings[2:], columns, BED_HISTORY_TYPES))
+
+    body = b"".join(parts)
+    header = struct.pack(HEADER_FORMAT, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, zlib.crc32(body))
+    with replacing_file(FILE_PATH, "wb") as file:
+        file.write(header)
+        file.write(body)
+
+def load_snapshot(FILE_PATH, csv_paths):
+    '''
+    Function to load all data from a binary snapshot file
+
+    Args:
+        FILE_PATH (str): path to snapshot file
+        csv_paths (list): paths to patient, room admission, and bed availability .csv files
+
+    Returns:
+        tuple or None: patient data, room admission data, and bed availability data,
+        None if snapshot is missing, corrupt, from another version, or older than .csv files
+    '''
+    if not os.path.exists(FILE_PATH):
+        return None
+    file = open(FILE_PATH, "rb")
+    buffer = file.read()
+    file.close()
+
+    header_size = struct.calcsize(HEADER_FORMAT)
+    if len(buffer) < header_size:
+        return None
+    magic, version, checksum = struct.unpack_from(HEADER_FORMAT, buffer)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        return None
+    body = memoryview(buffer)[header_size:]
+    if zlib.crc32(body) != checksum:
+        return None
+
+    offset = 0
+    for csv_path in csv_paths:
+        if struct.unpack_from("<QQ", body, offset) != get_file_stat(csv_path):
+            return None
+        offset += struct.calcsize("<QQ")
+
+    headings, columns, offset = unpack_table(body, offset)
+    patient_database = {"column": headings}
+    patient_database.update((row[0], row) for row in starmap(PatientRecord, zip(*columns)))
+
+    headings, columns, offset = unpack_table(body, offset)
+    room_database = [headings]
+    room_database.extend(starmap(RoomRecord, zip(*columns)))
+
+    headings, columns, offset = unpack_table(body, offset)
+    bed_database = BedHistory(headings)
+    bed_database.capacity = {key: values[0] for key, values in zip(headings, columns)}
+    # typed columns are used as they are, without building rows
+    _, columns, offset = unpack_table(body, offset)
+    bed_database.index, bed_database.epoch, bed_database.offset = columns[:3]
+    bed_database.count = dict(zip(headings[2:], columns[3:]))
+
+    return patient_database, room_database, bed_database
@@ -0,0 +1,435 @@
+import sys
+import sqlite3
+from pathlib import Path
+
+from bedhistory import BedHistory
+from records import PatientRecord, RoomRecord
+from metrics import timed, add_rows
+
+# file extensions of SQLite database, other paths are .csv files
+DATABASE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+# seconds to wait for other processes writing into database
+BUSY_TIMEOUT = 60
+
+PATIENT_HEADINGS = ["Patient_ID", "First_Name", "Last_Name", "Gender", "Birth_Date"]
+ROOM_HEADINGS = ["Index", "Patient_ID", "Room_Type", "Admission_Date", "Discharge_Date", "Status"]
+BED_HEADINGS = ["Index", "Timestamp", "VVIP", "VIP", "Kelas_1", "Kelas_2", "Kelas_3"]
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS patient (
+    Patient_ID TEXT PRIMARY KEY,
+    First_Name TEXT NOT NULL,
+    Last_Name TEXT NOT NULL,
+    Gender TEXT NOT NULL,
+    Birth_Date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS room (
+    "Index" INTEGER PRIMARY KEY,
+    Patient_ID TEXT NOT NULL,
+    Room_Type TEXT NOT NULL,
+    Admission_Date TEXT NOT NULL,
+    Discharge_Date TEXT NOT NULL,
+    Status TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bed (
+    "Index" INTEGER PRIMARY KEY,
+    Timestamp TEXT NOT NULL,
+    VVIP INTEGER NOT NULL,
+    VIP INTEGER NOT NULL,
+    Kelas_1 INTEGER NOT NULL,
+    Kelas_2 INTEGER NOT NULL,
+    Kelas_3 INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS patient_name ON patient (Last_Name, First_Name);
+CREATE INDEX IF NOT EXISTS patient_birth_date ON patient (Birth_Date);
+CREATE INDEX IF NOT EXISTS room_patient ON room (Patient_ID);
+CREATE INDEX IF NOT EXISTS room_type_status ON room (Room_Type, Status);
+CREATE INDEX IF NOT EXISTS room_status ON room (Status);
+CREATE INDEX IF NOT EXISTS room_admission_date ON room (Admission_Date);
+CREATE INDEX IF NOT EXISTS room_discharge_date ON room (Discharge_Date);
+CREATE INDEX IF NOT EXISTS bed_timestamp ON bed (Timestamp);
+-- rows changed since last compaction, read by other processes to catch up
+CREATE TABLE IF NOT EXISTS change (
+    Sequence INTEGER PRIMARY KEY AUTOINCREMENT,
+    Table_Name TEXT NOT NULL,
+    Row_Key TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    Name TEXT PRIMARY KEY,
+    Value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta VALUES ('generation', 0);
+'''
+
+# single row writes of each table, rows keep their position when changed
+UPSERT = {
+    "patient": '''INSERT INTO patient VALUES (?, ?, ?, ?, ?)
+                  ON CONFLICT (Patient_ID) DO UPDATE SET First_Name = excluded.First_Name,
+                  Last_Name = excluded.Last_Name, Gender = excluded.Gender, Birth_Date = excluded.Birth_Date''',
+    "room": '''INSERT INTO room VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT ("Index") DO UPDATE SET Patient_ID = excluded.Patient_ID,
+               Room_Type = excluded.Room_Type, Admission_Date = excluded.Admission_Date,
+               Discharge_Date = excluded.Discharge_Date, Status = excluded.Status''',
+    "bed": '''INSERT OR IGNORE INTO bed VALUES (?, ?, ?, ?, ?, ?, ?)'''
+}
+SELECT_ROW = {
+    "patient": '''SELECT * FROM patient WHERE Patient_ID = ?''',
+    "room": '''SELECT * FROM room WHERE "Index" = ?''',
+    "bed": '''SELECT * FROM bed WHERE "Index" = ?'''
+}
+
+def isDatabasePath(FILE_PATH):
+    '''
+    Function to check if path is a SQLite database instead of a .csv file
+
+    Args:
+        FILE_PATH (str)
+
+    Returns:
+        bool
+    '''
+    return FILE_PATH.endswith(DATABASE_EXTENSIONS)
+
+def connect_database(DB_PATH, isReadOnly=False):
+    '''
+    Function to open SQLite database in WAL mode, creating tables and indexes if missing
+
+    Args:
+        DB_PATH (str): path to SQLite database
+        isReadOnly (bool): True to open existing database for reading only, without creating anything
+
+    Returns:
+        sqlite3.Connection: connection without implicit transactions
+    '''
+    if isReadOnly:
+        return sqlite3.connect(Path(DB_PATH).resolve().as_uri() + "?mode=ro", uri=True, timeout=BUSY_TIMEOUT,
+                               isolation_level=None, check_same_thread=False)
+    # callers hold their own locks, so the connection may be used by several threads
+    connection = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+    # readers do not block the writer, and a commit appends to the WAL file only
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = FULL")
+    connection.executescript(SCHEMA)
+    return connection
+
+def load_patient_table(connection):
+    '''
+    Function to load patient data from SQLite database
+
+    Args:
+        connection (sqlite3.Connection)
+
+    Returns:
+        dict: patient data
+    '''
+    database = {"column": list(PATIENT_HEADINGS)}
+    for row in connection.execute("SELECT * FROM patient ORDER BY rowid"):
+        database[row[0]] = PatientRecord(*row)
+    return database
+
+def load_room_table(connection):
+    '''
+    Function to load room admission data from SQLite database
+
+    Args:
+        connection (sqlite3.Connection)
+
+    Returns:
+        list: room admission data
+    '''
+    database = [list(ROOM_HEADINGS)]
+    database.extend(RoomRecord(*row) for row in connection.execute('SELECT * FROM room ORDER BY "Index"'))
+    return database
+
+def load_bed_table(connection):
+    '''
+    Function to load bed availability data from SQLite database
+
+    Args:
+        connection (sqlite3.Connection)
+
+    Returns:
+        BedHistory: bed availability data
+    '''
+    database = BedHistory(list(BED_HEADINGS))
+    for row in connection.execute('SELECT * FROM bed ORDER BY "Index"'):
+        database.append(dict(zip(BED_HEADINGS, row)))
+    if len(database) < 2 or database[1]["Timestamp"] != "CAPACITY":
+        print("Bed capacity data missing. Please enter bed capacity data first.")
+        sys.exit()
+    return database
+
+def write_table(connection, table, rows):
+    '''
+    Function to replace all rows of a table of SQLite database at once
+
+    Args:
+        connection (sqlite3.Connection)
+        table (str): table name (patient, room, or bed)
+        rows (iterable): rows as lists of values, without headings
+
+    Returns:
+        None
+    '''
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        connection.execute(f"DELETE FROM {table}")
+        connection.executemany(UPSERT[table], rows)
+    except Exception:
+        connection.rollback()
+        raise
+    connection.commit()
+
+def get_database_rows(database):
+    '''
+    Function to get rows of patient, room admission, or bed availability data as lists of values
+
+    Args:
+        database (dict of list, list of dict, or BedHistory)
+
+    Returns:
+        generator: rows without headings
+    '''
+    if isinstance(database, dict):
+        return (list(row) for key, row in database.items() if key != "column")
+    return (list(row.values()) for row in database[1:])
+
+class TableJournal:
+    '''
+    Journal writing each changed row into its table of SQLite database, instead of appending it to a file.
+    Rows are written inside the transaction of SqliteData and saved when it is committed.
+
+    Args:
+        connection (sqlite3.Connection)
+    '''
+    def __init__(self, connection):
+        self.connection = connection
+
+    def write_row(self, table, row):
+        '''
+        Function to write a changed row into its table, and note the change for other processes
+
+        Args:
+            table (str): table name of row (patient, room, or bed)
+            row (list): full row after change
+
+        Returns:
+            None
+        '''
+        self.connection.execute(UPSERT[table], row)
+        self.connection.execute("INSERT INTO change (Table_Name, Row_Key) VALUES (?, ?)", (table, str(row[0])))
+
+    def flush(self):
+        '''
+        Function kept for the file interface, rows are saved when transaction is committed
+        '''
+
+class SqliteData:
+    '''
+    SQLite database shared by processes working on the same data, with the same use as SharedData:
+    holding it takes the write lock of the database, and changes are written row by row into tables
+    instead of a journal, so base data is never rewritten.
+
+    Changes of other processes are found in the change table, which is emptied by compact.
+    Opened read only, holding it takes a read transaction instead, which never blocks the writer.
+
+    Args:
+        db_path (str): path to SQLite database
+        isReadOnly (bool): True to only read data, e.g. for one-shot queries
+    '''
+    def __init__(self, db_path, isReadOnly=False):
+        self.db_path = db_path
+        self.isReadOnly = isReadOnly
+        self.connection = connect_database(db_path, isReadOnly)
+        self.journal = TableJournal(self.connection)
+        # generation of change table and last change already loaded into memory
+        self.generation = None
+        self.offset = 0
+        # rows written by this connection before the current transaction
+        self.total_changes = 0
+
+    def __enter__(self):
+        # a write transaction is held by one process at a time, others wait up to BUSY_TIMEOUT
+        self.connection.execute("BEGIN" if self.isReadOnly else "BEGIN IMMEDIATE")
+        self.total_changes = self.connection.total_changes
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # rows written while holding database are saved at once, or not at all if the change failed
+        if exc_type is None:
+            self.connection.commit()
+            return
+        self.connection.rollback()
+        self.offset = self.get_last_change()
+        if self.connection.total_changes > self.total_changes:
+            # memory may hold rows that were rolled back, so all data is loaded again on next read
+            self.generation = None
+
+    def get_generation(self):
+        '''
+        Function to get generation of change table, which changes when it is emptied
+
+        Args:
+            None
+
+        Returns:
+            int
+        '''
+        return self.connection.execute("SELECT Value FROM meta WHERE Name = 'generation'").fetchone()[0]
+
+    def get_last_change(self):
+        '''
+        Function to get sequence of last change
+
+        Args:
+            None
+
+        Returns:
+            int
+        '''
+        return self.connection.execute("SELECT COALESCE(MAX(Sequence), 0) FROM change").fetchone()[0]
+
+    def get_journal_size(self):
+        '''
+        Function to get number of rows in change table, which grows like the journal of SharedData
+
+        Args:
+            None
+
+        Returns:
+            int
+        '''
+        return self.connection.execute("SELECT COUNT(*) FROM change").fetchone()[0]
+
+    @timed("load_database")
+    def load(self):
+        '''
+        Function to load all data, called while holding database
+
+        Args:
+            None
+
+        Returns:
+            dict of list, list of dict, BedHistory: patient data, room admission data, and bed availability data
+        '''
+        database = (load_patient_table(self.connection), load_room_table(self.connection),
+                    load_bed_table(self.connection))
+        add_rows(sum(len(table) - 1 for table in database))
+        self.generation = self.get_generation()
+        self.offset = self.get_last_change()
+        return database
+
+    def read_changes(self):
+        '''
+        Function to read rows changed by other processes since last read, called while holding database
+
+        Args:
+            None
+
+        Returns:
+            list or None: changed rows (table name followed by row), None if another process
+            has emptied change table and all data must be loaded again
+        '''
+        if self.get_generation() != self.generation:
+            return None
+        rows = []
+        changes = self.connection.execute("SELECT Sequence, Table_Name, Row_Key FROM change WHERE Sequence > ?",
+                                          (self.offset,)).fetchall()
+        for sequence, table, key in changes:
+            row = self.connection.execute(SELECT_ROW[table], (key,)).fetchone()
+            rows.append([table, *row])
+            self.offset = sequence
+        return rows
+
+    def mark_written(self):
+        '''
+        Function to skip changes of this process on next read, called while holding database
+
+        Args:
+            None
+
+        Returns:
+            None
+        '''
+        self.offset = self.get_last_change()
+
+    @timed("compact")
+    def compact(self, patient_database, room_database, bed_database):
+        '''
+        Function to empty change table, called while holding database after changes of other processes are read.
+        Tables already hold all data, so data arguments are only kept for the SharedData interface
+
+        Args:
+            patient_database (dict of list): patient data
+            room_database (list of dict): room admission data
+            bed_database (BedHistory): bed availability data
+
+        Returns:
+            None
+        '''
+        self.connection.execute("DELETE FROM change")
+        self.connection.execute("UPDATE meta SET Value = Value + 1 WHERE Name = 'generation'")
+        self.generation = self.get_generation()
+        self.offset = 0
+
+    def read_current_bed(self):
+        '''
+        Function to read most recent bed availability row without loading all data, called while holding database
+
+        Args:
+            None
+
+        Returns:
+            dict: bed availability row
+        '''
+        row = self.connection.execute('SELECT * FROM bed ORDER BY "Index" DESC LIMIT 1').fetchone()
+        if row is None:
+            print("Bed capacity data missing. Please enter bed capacity data first.")
+            sys.exit()
+        return dict(zip(BED_HEADINGS, row))
+
+    def read_patient(self, patient_id):
+        '''
+        Function to read a patient row and its room admission rows without loading all data,
+        called while holding database
+
+        Args:
+            patient_id (str)
+
+        Returns:
+            PatientRecord or None, list: patient row, None if patient ID does not exist, and room admission rows
+        '''
+        row = self.connection.execute(SELECT_ROW["patient"], (patient_id,)).fetchone()
+        admissions = self.connection.execute('SELECT * FROM room WHERE Patient_ID = ? ORDER BY "Index"',
+                                             (patient_id,))
+        return (PatientRecord(*row) if row else None), [RoomRecord(*row) for row in admissions]
+
+    def read_census(self):
+        '''
+        Function to count ONGOING patients of each room type and in total without loading all data,
+        called while holding database
+
+        Args:
+            None
+
+        Returns:
+            dict: room type -> number of ONGOING patients, and Total
+        '''
+        census = dict.fromkeys(BED_HEADINGS[2:], 0)
+        rows = self.connection.execute("SELECT Room_Type, COUNT(*) FROM room WHERE Status = 'ONGOING' "
+                                       "GROUP BY Room_Type")
+        census.update(rows)
+        census["Total"] = sum(census.values())
+        return census
+
+    def close(self):
+        '''
+        Function to close database
+
+        Args:
+            None
+
+        Returns:
+            None
+        '''
+        self.connection.close()
@@ -0,0 +1,849 @@
+import sys
+import os
+import io
+import csv
+import json
+from contextlib import closing
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no fcntl, msvcrt is used for file locking instead
+    import msvcrt
+    fcntl = None
+
+from snapshot import load_snapshot, write_snapshot, get_file_stat, replacing_file
+from bedhistory import BedHistory
+from records import PatientRecord, RoomRecord
+from sqlitedata import isDatabasePath, connect_database, write_table, get_database_rows
+from sqlitedata import load_patient_table, load_room_table, load_bed_table
+from metrics import timed, add_rows
+
+# bytes read from end of .csv file at a time when looking for its last row
+TAIL_SIZE = 4096
+
+class LoadLimitError(Exception):
+    '''
+    Error raised when .csv files to be loaded hold more raw text than the load limit
+    '''
+
+def read_csv_rows(FILE_PATH, max_bytes=None):
+    '''
+    Generator to read .csv file row by row, closing it once all rows are read
+
+    Args:
+        FILE_PATH (str): path to .csv file to be read
+        max_bytes (int or None): maximum bytes of raw text read, None for no limit
+
+    Yields:
+        list: parsed row, first row is headings
+    '''
+    with open(FILE_PATH, "r", newline='') as file:
+        size = 0
+        for row in csv.reader(file, delimiter=";"):
+            if max_bytes is not None:
+                # field lengths plus delimiters and line break
+                size += sum(map(len, row)) + len(row)
+                if size > max_bytes:
+                    raise LoadLimitError(f"{FILE_PATH} holds more than the load limit of {max_bytes} bytes.")
+            yield row
+
+def parse_patient_row(row):
+    '''
+    Function to convert a .csv row into patient data row
+
+    Args:
+        row (list): row read from .csv file
+
+    Returns:
+        PatientRecord
+    '''
+    patient_id, first_name, last_name, gender, birth_date = row
+    return PatientRecord(
+        str(patient_id), 
+        str(first_name),
+        str(last_name),
+        str(gender),
+        str(birth_date)
+    )
+
+def parse_room_row(row):
+    '''
+    Function to convert a .csv row into room admission data row
+
+    Args:
+        row (list): row read from .csv file
+
+    Returns:
+        RoomRecord
+    '''
+    index, patient_id, room_type, admission_date, discharge_date, status = row
+    return RoomRecord(
+        int(index),
+        str(patient_id),
+        str(room_type),
+        str(admission_date),
+        str(discharge_date),
+        str(status)
+    )
+
+def parse_bed_row(headings, row):
+    '''
+    Function to convert a .csv row into bed availability data row
+
+    Args:
+        headings (list): column names of bed availability data
+        row (list): row read from .csv file
+
+    Returns:
+        dict
+    '''
+    index, timestamp, vvip, vip, kelas_1, kelas_2, kelas_3 = row
+    return {
+        headings[0]: int(index),
+        headings[1]: str(timestamp),
+        headings[2]: int(vvip),
+        headings[3]: int(vip),
+        headings[4]: int(kelas_1),
+        headings[5]: int(kelas_2),
+        headings[6]: int(kelas_3)
+    }
+
+@timed("load_patient")
+def load_patient(FILE_PATH, max_bytes=None):
+    '''
+    Function to load patient data
+    
+    Args:
+        FILE_PATH (str): path to CSV file or SQLite database containing patient data
+        max_bytes (int or None): maximum bytes of raw text read from CSV file, None for no limit
+    
+    Returns:
+        dict: patient data
+    '''
+    if isDatabasePath(FILE_PATH):
+        with closing(connect_database(FILE_PATH)) as connection:
+            database = load_patient_table(connection)
+        add_rows(len(database) - 1)
+        return database
+    reader = read_csv_rows(FILE_PATH, max_bytes)
+    headings = next(reader)
+
+    try:
+        assert headings == ["Patient_ID", "First_Name", "Last_Name", "Gender", "Birth_Date"]
+    except:
+        headings = ["Patient_ID", "First_Name", "Last_Name", "Gender", "Birth_Date"]
+
+    database = {"column": headings}
+    for row in reader:
+        if len(row) == 0:
+            continue
+        patient_row = parse_patient_row(row)
+        database.update({patient_row[0]: patient_row})
+    add_rows(len(database) - 1)
+    return database
+
+@timed("load_room")
+def load_room(FILE_PATH, max_bytes=None):
+    '''
+    Function to load room admission data
+    
+    Args:
+        FILE_PATH (str): path to CSV file or SQLite database containing room admission data
+        max_bytes (int or None): maximum bytes of raw text read from CSV file, None for no limit
+    
+    Returns:
+        list: room admission data
+    '''
+    if isDatabasePath(FILE_PATH):
+        with closing(connect_database(FILE_PATH)) as connection:
+            database = load_room_table(connection)
+        add_rows(len(database) - 1)
+        return database
+
+    reader = read_csv_rows(FILE_PATH, max_bytes)
+    headings = next(reader)
+    try:
+        assert headings ==  ["Index", "Patient_ID", "Room_Type", "Admission_Date", "Discharge_Date", "Status"]
+    except:
+        headings = ["Index", "Patient_ID", "Room_Type", "Admission_Date", "Discharge_Date", "Status"]
+    database = []
+    database.append(headings)
+
+    for row in reader:
+        if len(row) == 0:
+            continue
+        database.append(parse_room_row(row))
+
+    add_rows(len(database) - 1)
+    return database
+
+@timed("load_bed")
+def load_bed(FILE_PATH, max_bytes=None):
+    '''
+    Function to load bed availability data
+    
+    Args:
+        FILE_PATH (str): path to .csv file or SQLite database containing bed availability data
+        max_bytes (int or None): maximum bytes of raw text read from .csv file, None for no limit
+    
+    Returns:
+        BedHistory: bed availability data
+    '''
+    if isDatabasePath(FILE_PATH):
+        with closing(connect_database(FILE_PATH)) as connection:
+            database = load_bed_table(connection)
+        add_rows(len(database) - 1)
+        return database
+    reader = read_csv_rows(FILE_PATH, max_bytes)
+    headings = next(reader)
+    # assign column names if headings is empty 
+    try:
+        assert headings ==  ["Index", "Timestamp", "VVIP", "VIP", "Kelas_1", "Kelas_2", "Kelas_3"]
+    except:
+        headings = ["Index", "Timestamp", "VVIP", "VIP", "Kelas_1", "Kelas_2", "Kelas_3"]
+    database = BedHistory(headings)
+
+    capacity_found = False
+    for row in reader:
+        if len(row) == 0:
+            continue
+
+        if not capacity_found:
+            try:
+                assert row[1] == "CAPACITY"
+            except:
+                print("Bed capacity data missing. Please enter bed capacity data first.")
+                sys.exit()
+            capacity_found = True
+            database.append(parse_bed_row(headings, row))
+        else:
+            database.append_values(row)
+    add_rows(len(database) - 1)
+    return database
+
+@timed("dict_of_list_to_csv")
+def dict_of_list_to_csv(FILE_PATH, database):
+    '''
+    Function to write database into .csv file, or patient table of SQLite database
+    
+    Args:
+        FILE_PATH (str): path to .csv file or SQLite database to be written
+        database (dict of list): database to be written into .csv file
+    
+    Returns:
+        None
+    '''
+    add_rows(len(database) - 1)
+    if isDatabasePath(FILE_PATH):
+        with closing(connect_database(FILE_PATH)) as connection:
+            write_table(connection, "patient", get_database_rows(database))
+        return
+    with replacing_file(FILE_PATH, newline='') as file:
+        writer = csv.writer(file, delimiter=";")
+        writer.writerows(database.values())
+
+@timed("list_of_dict_to_csv")
+def list_of_dict_to_csv(FILE_PATH, database):
+    '''
+    Function to write database into .csv file, or room or bed table of SQLite database
+    
+    Args:
+        FILE_PATH (str): path to .csv file or SQLite database to be written
+        database (list of dict): database to be written into .csv file
+    
+    Returns:
+        None
+    '''
+    add_rows(len(database) - 1)
+    if isDatabasePath(FILE_PATH):
+        table = "bed" if isinstance(database, BedHistory) else "room"
+        with closing(connect_database(FILE_PATH)) as connection:
+            write_table(connection, table, get_database_rows(database))
+        return
+    with replacing_file(FILE_PATH, newline='') as file:
+        writer = csv.writer(file, delimiter=";")
+        writer.writerow(database[0])
+        writer.writerows(row.values() for row in database[1:])
+
+def replay_journal(JOURNAL_PATH, patient_database, room_database, bed_database):
+    '''
+    Function to apply changes saved in journal, which are not yet written into base .csv files.
+    Only rows ended with line break are applied, a row torn by a crash while it was appended
+    is cut off the journal, so the next row is not appended onto it. Called while holding lock
+
+    Args:
+        JOURNAL_PATH (str): path to journal file
+        patient_database (dict of list): patient data
+        room_database (list of dict): room admission data
+        bed_database (BedHistory): bed availability data
+
+    Returns:
+        int: number of replayed rows
+    '''
+    if not os.path.exists(JOURNAL_PATH):
+        return 0
+    rows, end = read_journal(JOURNAL_PATH)
+    truncate_journal(JOURNAL_PATH, end)
+
+    # room rows are changed in place, so find their position by index
+    room_positions = None
+    count = 0
+    for row in rows:
+        table, row = row[0], row[1:]
+
+        if table == "patient":
+            patient_row = parse_patient_row(row)
+            patient_database[patient_row[0]] = patient_row
+
+        elif table == "room":
+            room_row = parse_room_row(row)
+            if room_positions is None:
+                room_positions = {room_database[i]["Index"]: i for i in range(1, len(room_database))}
+            position = room_positions.get(room_row["Index"])
+            if position is None:
+                room_database.append(room_row)
+                room_positions[room_row["Index"]] = len(room_database) - 1
+            else:
+                room_database[position] = room_row
+
+        elif table == "bed":
+            # bed rows are only added, skip rows already written into base file
+            bed_row = parse_bed_row(bed_database[0], row)
+            if bed_row["Index"] > bed_database[-1]["Index"]:
+                bed_database.append(bed_row)
+
+        count += 1
+    return count
+
+def compact_journal(journal, csv_paths, patient_database, room_database, bed_database, snapshot_path=None):
+    '''
+    Function to write all data into base .csv files and empty the journal
+
+    Args:
+        journal (file): journal file opened in append mode
+        csv_paths (list): paths to patient, room admission, and bed availability .csv files
+        patient_database (dict of list): patient data
+        room_database (list of dict): room admission data
+        bed_database (BedHistory): bed availability data
+        snapshot_path (str or None): path to snapshot file, None to skip writing snapshot
+
+    Returns:
+        None
+    '''
+    patient_path, room_path, bed_path = csv_paths
+    dict_of_list_to_csv(patient_path, patient_database)
+    list_of_dict_to_csv(room_path, room_database)
+    list_of_dict_to_csv(bed_path, bed_database)
+    if snapshot_path:
+        write_snapshot(snapshot_path, csv_paths, patient_database, room_database, bed_database)
+    # replaying a journal twice gives the same data,
+    # so base files are written before journal is emptied
+    journal.seek(0)
+    journal.truncate()
+    journal.flush()
+    os.fsync(journal.fileno())
+
+def load_database(csv_paths, journal_path, snapshot_path=None, max_bytes=None):
+    '''
+    Function to load patient, room admission, and bed availability data, from snapshot
+    if it is up to date with .csv files, then apply changes saved in journal
+
+    Args:
+        csv_paths (list): paths to patient, room admission, and bed availability .csv files
+        journal_path (str): path to journal file
+        snapshot_path (str or None): path to snapshot file, None to always load .csv files
+        max_bytes (int or None): maximum bytes of raw text of all .csv files together, None for no limit
+
+    Returns:
+        dict of list, list of dict, BedHistory: patient data, room admission data, and bed availability data
+    '''
+    if max_bytes is not None:
+        # checked before anything is loaded, snapshot holds the same rows as .csv files
+        size = sum(os.path.getsize(csv_path) for csv_path in csv_paths)
+        if size > max_bytes:
+            raise LoadLimitError(f"Data files hold {size} bytes, more than the load limit of {max_bytes} bytes.")
+    snapshot = load_snapshot(snapshot_path, csv_paths) if snapshot_path else None
+    if snapshot:
+        patient_database, room_database, bed_database = snapshot
+    else:
+        patient_path, room_path, bed_path = csv_paths
+        # each file may use what the files loaded before it left of the limit
+        remaining = max_bytes
+        bed_database = load_bed(bed_path, remaining)
+        if remaining is not None:
+            remaining -= os.path.getsize(bed_path)
+        patient_database = load_patient(patient_path, remaining)
+        if remaining is not None:
+            remaining -= os.path.getsize(patient_path)
+        room_database = load_room(room_path, remaining)
+        if snapshot_path:
+            write_snapshot(snapshot_path, csv_paths, patient_database, room_database, bed_database)
+    # apply changes not yet written into base files
+    replay_journal(journal_path, patient_database, room_database, bed_database)
+    return patient_database, room_database, bed_database
+
+def read_admission_file(FILE_PATH):
+    '''
+    Function to open admission import file, either .jsonl (one JSON object per line)
+    or .csv (semicolon separated with column names in first row), and read its rows
+
+    Args:
+        FILE_PATH (str): path to admission import file
+
+    Returns:
+        generator: rows given by read_admission_rows, file is opened before any row is read,
+        so OSError is raised here if it cannot be opened
+    '''
+    isJsonLines = FILE_PATH.endswith(".jsonl")
+    file = open(FILE_PATH, "r") if isJsonLines else open(FILE_PATH, "r", newline='')
+    return read_admission_rows(file, isJsonLines)
+
+def read_admission_rows(file, isJsonLines):
+    '''
+    Generator to read rows of opened admission import file, closing it once all rows are read
+
+    Args:
+        file (file): admission import file
+        isJsonLines (bool): True if file is .jsonl, else .csv
+
+    Yields:
+        int, dict or None, str: line number in file, admission row or None if line cannot be read,
+        and reason why it cannot be read
+    '''
+    with file:
+        if isJsonLines:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as error:
+                    yield line_number, None, f"invalid JSON ({error})"
+                    continue
+                if not isinstance(row, dict):
+                    yield line_number, None, "line is not a JSON object"
+                    continue
+                yield line_number, row, ""
+        else:
+            reader = csv.reader(file, delimiter=";")
+            headings = next(reader, [])
+            for row in reader:
+                if len(row) == 0:
+                    continue
+                # line number after row is read, rows may span lines inside quotes
+                yield reader.line_num, dict(zip(headings, row)), ""
+
+def lock_file(file, isShared=False):
+    '''
+    Function to wait for advisory lock of a file, shared between processes
+
+    Args:
+        file (file): lock file
+        isShared (bool): True for a shared lock held by readers at the same time,
+                         exclusive on Windows, which has no shared lock
+
+    Returns:
+        None
+    '''
+    if fcntl:
+        fcntl.flock(file.fileno(), fcntl.LOCK_SH if isShared else fcntl.LOCK_EX)
+        return
+    file.seek(0)
+    while True:
+        try:
+            # LK_LOCK gives up after 10 seconds, so keep trying
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+def unlock_file(file):
+    '''
+    Function to release advisory lock of a file
+
+    Args:
+        file (file): lock file
+
+    Returns:
+        None
+    '''
+    if fcntl:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+        return
+    file.seek(0)
+    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def read_journal(JOURNAL_PATH, offset=0):
+    '''
+    Function to read journal rows written after offset
+
+    Args:
+        JOURNAL_PATH (str): path to journal file
+        offset (int): position in bytes to start reading from
+
+    Returns:
+        list, int: journal rows (table name followed by row), and position after last complete row
+    '''
+    if not os.path.exists(JOURNAL_PATH):
+        return [], 0
+    with open(JOURNAL_PATH, "rb") as file:
+        file.seek(offset)
+        data = file.read()
+    # a row not yet ended with line break is read next time
+    end = data.rfind(b"\n") + 1
+    reader = csv.reader(io.StringIO(data[:end].decode(), newline=''), delimiter=";")
+    return [row for row in reader if row], offset + end
+
+def read_headings(FILE_PATH):
+    '''
+    Function to read column names of .csv file without reading its rows
+
+    Args:
+        FILE_PATH (str): path to .csv file
+
+    Returns:
+        list
+    '''
+    with open(FILE_PATH, "r", newline='') as file:
+        return next(csv.reader(file, delimiter=";"), [])
+
+def read_last_row(FILE_PATH):
+    '''
+    Function to read last row of .csv file, reading only the end of the file
+
+    Args:
+        FILE_PATH (str): path to .csv file
+
+    Returns:
+        list
+    '''
+    with open(FILE_PATH, "rb") as file:
+        end = file.seek(0, os.SEEK_END)
+        size = TAIL_SIZE
+        while True:
+            start = max(0, end - size)
+            file.seek(start)
+            lines = [line for line in file.read(end - start).splitlines() if line.strip()]
+            # last line is complete once a line before it is found, or the whole file is read
+            if len(lines) >= 2 or start == 0:
+                break
+            size *= 2
+    return next(csv.reader([lines[-1].decode()], delimiter=";"))
+
+def read_rows_containing(FILE_PATH, text):
+    '''
+    Generator to read rows of .csv file whose line contains text, other lines are skipped without parsing
+
+    Args:
+        FILE_PATH (str): path to .csv file
+        text (str)
+
+    Yields:
+        list: parsed row
+    '''
+    with open(FILE_PATH, "r", newline='') as file:
+        lines = (line for line in file if text in line)
+        yield from csv.reader(lines, delimiter=";")
+
+def read_journal_changes(JOURNAL_PATH):
+    '''
+    Function to read last journal row of each patient and room admission, and bed rows in journal
+
+    Args:
+        JOURNAL_PATH (str): path to journal file
+
+    Returns:
+        dict, dict, list: patient ID -> patient row, room index -> room admission row, bed rows
+    '''
+    patient_changes, room_changes, bed_rows = {}, {}, []
+    for row in read_journal(JOURNAL_PATH)[0]:
+        table, row = row[0], row[1:]
+        if table == "patient":
+            patient_changes[row[0]] = parse_patient_row(row)
+        elif table == "room":
+            room_row = parse_room_row(row)
+            room_changes[room_row["Index"]] = room_row
+        elif table == "bed":
+            bed_rows.append(row)
+    return patient_changes, room_changes, bed_rows
+
+def read_current_bed(BED_PATH, JOURNAL_PATH):
+    '''
+    Function to read most recent bed availability row, from journal or else from end of base .csv file
+
+    Args:
+        BED_PATH (str): path to bed availability .csv file
+        JOURNAL_PATH (str): path to journal file
+
+    Returns:
+        dict: bed availability row
+    '''
+    headings = read_headings(BED_PATH)
+    bed_rows = read_journal_changes(JOURNAL_PATH)[2]
+    row = bed_rows[-1] if bed_rows else read_last_row(BED_PATH)
+    if row == headings:
+        print("Bed capacity data missing. Please enter bed capacity data first.")
+        sys.exit()
+    return parse_bed_row(headings, row)
+
+def read_patient_admissions(PATIENT_PATH, ROOM_PATH, JOURNAL_PATH, patient_id):
+    '''
+    Function to read a patient row and room admission rows of the patient from base .csv files and journal,
+    parsing only lines holding patient ID
+
+    Args:
+        PATIENT_PATH (str): path to patient .csv file
+        ROOM_PATH (str): path to room admission .csv file
+        JOURNAL_PATH (str): path to journal file
+        patient_id (str)
+
+    Returns:
+        PatientRecord or None, list: patient row, None if patient ID does not exist,
+        and room admission rows of the patient in order of index
+    '''
+    patient_changes, room_changes, _ = read_journal_changes(JOURNAL_PATH)
+    patient_row = patient_changes.get(patient_id)
+    if patient_row is None:
+        for row in read_rows_containing(PATIENT_PATH, patient_id):
+            if row[0] == patient_id:
+                patient_row = parse_patient_row(row)
+                break
+
+    admissions = {}
+    for row in read_rows_containing(ROOM_PATH, f";{patient_id};"):
+        if row[1] == patient_id:
+            room_row = parse_room_row(row)
+            admissions[room_row["Index"]] = room_row
+    # rows changed in journal replace rows of base file
+    for index, room_row in room_changes.items():
+        if room_row["Patient_ID"] == patient_id:
+            admissions[index] = room_row
+        else:
+            admissions.pop(index, None)
+    return patient_row, [admissions[index] for index in sorted(admissions)]
+
+def read_room_census(ROOM_PATH, BED_PATH, JOURNAL_PATH):
+    '''
+    Function to count ONGOING patients of each room type and in total from base .csv file and journal,
+    parsing only lines holding ONGOING status
+
+    Args:
+        ROOM_PATH (str): path to room admission .csv file
+        BED_PATH (str): path to bed availability .csv file, for room types
+        JOURNAL_PATH (str): path to journal file
+
+    Returns:
+        dict: room type -> number of ONGOING patients, and Total
+    '''
+    census = dict.fromkeys(read_headings(BED_PATH)[2:], 0)
+    room_changes = read_journal_changes(JOURNAL_PATH)[1]
+    for row in read_rows_containing(ROOM_PATH, ";ONGOING"):
+        # rows changed in journal are counted from journal
+        if row[5] == "ONGOING" and int(row[0]) not in room_changes:
+            census[row[2]] = census.get(row[2], 0) + 1
+    for room_row in room_changes.values():
+        if room_row["Status"] == "ONGOING":
+            census[room_row["Room_Type"]] = census.get(room_row["Room_Type"], 0) + 1
+    census["Total"] = sum(census.values())
+    return census
+
+def truncate_journal(JOURNAL_PATH, end):
+    '''
+    Function to cut off a torn row after the last complete row of journal, called while holding lock,
+    when rows of other processes are always complete
+
+    Args:
+        JOURNAL_PATH (str): path to journal file
+        end (int): position in bytes after last complete row
+
+    Returns:
+        None
+    '''
+    if os.path.getsize(JOURNAL_PATH) > end:
+        os.truncate(JOURNAL_PATH, end)
+
+class SharedData:
+    '''
+    Base .csv files, journal, and snapshot shared by processes working on the same data,
+    guarded by an advisory lock file next to journal.
+
+    While holding the lock, a process first reads changes other processes wrote into journal,
+    then writes its own, so no process writes over changes it has not seen.
+    Opened read only, holding it takes a shared lock, and no journal or lock file is created.
+
+    Args:
+        csv_paths (list): paths to patient, room admission, and bed availability .csv files
+        journal_path (str): path to journal file
+        snapshot_path (str or None): path to snapshot file, None to skip snapshot
+        isReadOnly (bool): True to only read data, e.g. for one-shot queries
+        max_bytes (int or None): maximum bytes of raw text of .csv files loaded, None for no limit
+    '''
+    def __init__(self, csv_paths, journal_path, snapshot_path=None, isReadOnly=False, max_bytes=None):
+        self.csv_paths = csv_paths
+        self.max_bytes = max_bytes
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self.isReadOnly = isReadOnly
+        if isReadOnly:
+            # without lock file, no process has opened data files to write them yet
+            lock_path = journal_path + ".lock"
+            self.lock_file = open(lock_path, "r") if os.path.exists(lock_path) else None
+            self.journal = None
+        else:
+            self.lock_file = open(journal_path + ".lock", "a")
+            self.journal = open(journal_path, "a", newline='')
+        # stat of base files and journal size already loaded into memory
+        self.csv_stats = None
+        self.offset = 0
+
+    def __enter__(self):
+        if self.lock_file:
+            lock_file(self.lock_file, isShared=self.isReadOnly)
+        return self
+
+    def __exit__(self, *args):
+        if self.lock_file:
+            unlock_file(self.lock_file)
+
+    def get_csv_stats(self):
+        '''
+        Function to get stat of base .csv files, which changes when they are rewritten
+
+        Args:
+            None
+
+        Returns:
+            list
+        '''
+        return [get_file_stat(csv_path) for csv_path in self.csv_paths]
+
+    def get_journal_size(self):
+        '''
+        Function to get journal size in bytes, including rows of other processes
+
+        Args:
+            None
+
+        Returns:
+            int
+        '''
+        return os.fstat(self.journal.fileno()).st_size
+
+    @timed("load_database")
+    def load(self):
+        '''
+        Function to load all data, called while holding lock
+
+        Args:
+            None
+
+        Returns:
+            dict of list, list of dict, BedHistory: patient data, room admission data, and bed availability data
+        '''
+        database = load_database(self.csv_paths, self.journal_path, self.snapshot_path, self.max_bytes)
+        self.csv_stats = self.get_csv_stats()
+        self.offset = self.get_journal_size()
+        return database
+
+    def read_changes(self):
+        '''
+        Function to read journal rows written by other processes since last read, called while holding lock
+
+        Args:
+            None
+
+        Returns:
+            list or None: journal rows, None if another process has rewritten base .csv files
+            and all data must be loaded again
+        '''
+        if self.get_csv_stats() != self.csv_stats:
+            return None
+        rows, self.offset = read_journal(self.journal_path, self.offset)
+        # a torn row left by a process that crashed is cut off before rows of this process are appended
+        truncate_journal(self.journal_path, self.offset)
+        return rows
+
+    def mark_written(self):
+        '''
+        Function to flush journal rows of this process and skip them on next read, called while holding lock
+
+        Args:
+            None
+
+        Returns:
+            None
+        '''
+        self.journal.flush()
+        self.offset = self.get_journal_size()
+
+    @timed("compact")
+    def compact(self, patient_database, room_database, bed_database):
+        '''
+        Function to write all data into base .csv files and empty the journal,
+        called while holding lock after changes of other processes are read
+
+        Args:
+            patient_database (dict of list): patient data
+            room_database (list of dict): room admission data
+            bed_database (BedHistory): bed availability data
+
+        Returns:
+            None
+        '''
+        compact_journal(self.journal, self.csv_paths, patient_database, room_database, bed_database,
+                        self.snapshot_path)
+        self.csv_stats = self.get_csv_stats()
+        self.offset = 0
+
+    def read_current_bed(self):
+        '''
+        Function to read most recent bed availability row without loading all data, called while holding lock
+
+        Args:
+            None
+
+        Returns:
+            dict: bed availability row
+        '''
+        return read_current_bed(self.csv_paths[2], self.journal_path)
+
+    def read_patient(self, patient_id):
+        '''
+        Function to read a patient row and its room admission rows without loading all data,
+        called while holding lock
+
+        Args:
+            patient_id (str)
+
+        Returns:
+            PatientRecord or None, list: patient row, None if patient ID does not exist, and room admission rows
+        '''
+        return read_patient_admissions(self.csv_paths[0], self.csv_paths[1], self.journal_path, patient_id)
+
+    def read_census(self):
+        '''
+        Function to count ONGOING patients of each room type and in total without loading all data,
+        called while holding lock
+
+        Args:
+            None
+
+        Returns:
+            dict: room type -> number of ONGOING patients, and Total
+        '''
+        return read_room_census(self.csv_paths[1], self.csv_paths[2], self.journal_path)
+
+    def close(self):
+        '''
+        Function to close journal and lock file
+
+        Args:
+            None
+
+        Returns:
+            None
+        '''
+        for file in [self.journal, self.lock_file]:
+            if file:
+                file.close()
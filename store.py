@@ -0,0 +1,1503 @@
+from datetime import datetime, timezone
+from array import array
+from records import PatientRecord, RoomRecord, date_to_day
+from bedhistory import format_timestamp
+from storage import parse_patient_row, parse_room_row, parse_bed_row
+from metrics import add_rows
+from contextlib import contextmanager
+import threading
+import time
+import bisect
+import csv
+import os
+import re
+
+DATE_FORMAT = "%Y-%m-%d"
+PATIENT_ID_FORMAT = r"^P-[0-9]+$"
+PATIENT_INDEX_KEYS = ["First_Name", "Last_Name", "Gender", "Birth_Date"]
+NULL_PROFILE = ["NULL", "NULL", "NULL", "NULL"]
+# day number attribute of room admission rows for each date column
+DAY_KEYS = {"Admission_Date": "admission_day", "Discharge_Date": "discharge_day"}
+# minute since epoch and UTC offset of local time in minutes at that minute, see get_current_epoch
+LOCAL_OFFSET = (None, 0)
+
+### GENERAL FUNCTIONS ###
+
+def isEmptyDatabase(database):
+    '''
+    Function to check if database is empty, indicated by length < 2,
+    to handle cases where only database has only columns without entries
+
+    Args:
+        database (list of dict or dict of list)
+
+    Returns:
+        bool
+
+    '''
+    if len(database) < 2: return True
+    else: return False
+
+def get_current_datetime_str():
+    '''
+    Function to get current datetime as string in format YYYY-MM-DDTHH:MM:SS+HH:MM
+    with last +HH:MM as timezone indicator to UTC
+
+    Args:
+        None
+
+    Returns:
+        str
+    '''
+    return format_timestamp(*get_current_epoch())
+
+def get_current_epoch():
+    '''
+    Function to get current time as seconds since epoch and UTC offset of local time in minutes,
+    with UTC offset computed once per minute and reused for every bed event within it
+
+    Args:
+        None
+
+    Returns:
+        int, int
+    '''
+    global LOCAL_OFFSET
+    epoch = int(time.time())
+    minute, offset = LOCAL_OFFSET
+    # UTC offset only changes at daylight saving transitions, which start on a whole minute
+    if minute != epoch // 60:
+        offset = int(datetime.fromtimestamp(epoch, timezone.utc).astimezone().utcoffset().total_seconds()) // 60
+        LOCAL_OFFSET = (epoch // 60, offset)
+    return epoch, offset
+
+def get_current_date_str():
+    '''
+    Function to get current date as string in format YYYY-MM-DD
+
+    Args:
+        None
+        
+    Returns:
+        str
+
+    '''
+    return datetime.today().strftime(DATE_FORMAT)
+
+def date_to_str(date):
+    '''
+    Function to convert date in datetime.date type to string in format DATE_FORMAT
+
+    Args:
+        date (datetime.date)
+    Returns:
+        str
+    '''
+    return date.strftime(DATE_FORMAT)
+
+def get_day_range(start_date, end_date):
+    '''
+    Function to convert start date and end date into ordinal day numbers
+
+    Args:
+        start_date (str): first date in format YYYY-MM-DD
+        end_date (str): last date in format YYYY-MM-DD
+
+    Returns:
+        int, int
+
+    Raises:
+        ValueError: if a date is not in format YYYY-MM-DD
+    '''
+    start, end = date_to_day(start_date), date_to_day(end_date)
+    if start is None:
+        raise ValueError(f"Invalid start date {start_date!r}, expected YYYY-MM-DD.")
+    if end is None:
+        raise ValueError(f"Invalid end date {end_date!r}, expected YYYY-MM-DD.")
+    return start, end
+
+def filter_data_header(data, header, key, val):
+    '''
+    Fungsi untuk memfilter data dengan mengambil data ketika val ada di dalam data
+
+    Args:
+        data (list)
+        header (list): column names of data
+        key (str): column name of val
+        val
+
+    Returns:
+        list
+
+    '''
+    # get index of key in header
+    index = header.index(key)
+    
+    # get row where row[index] = val for each row in data
+    filtered_data = list(filter(lambda row: row[index] == val, data))
+    return filtered_data
+
+def filter_range_date(data, header, key, start_date, end_date):
+    '''
+    Function to filter data based on range date (start date to end date)
+
+    Args:
+        data (list)
+        header (list): column names of data
+        key (str): column name of dates
+        start_date (str): first date in format YYYY-MM-DD
+        end_date (str): last date in format YYYY-MM-DD
+
+    Returns:
+        list
+    '''
+    # get index of key in header
+    index = header.index(key)
+    start, end = get_day_range(start_date, end_date)
+    # rows without a date, e.g. discharge date N/A, are never in range
+    return [row for row in data if start <= (date_to_day(row[index]) or 0) <= end]
+
+def search_room_range(room_database, key, start_date, end_date):
+    '''
+    Function to get room admission rows with admission or discharge date between start date and end date
+    (inclusive), comparing day numbers kept in rows since they were loaded
+
+    Args:
+        room_database (list of dict): room admission data
+        key (str): Admission_Date or Discharge_Date
+        start_date (str): first date in format YYYY-MM-DD
+        end_date (str): last date in format YYYY-MM-DD
+
+    Returns:
+        list: room admission rows
+    '''
+    start, end = get_day_range(start_date, end_date)
+    attribute = DAY_KEYS[key]
+    return [row for row in room_database[1:] if start <= (getattr(row, attribute) or 0) <= end]
+
+def isAlphaName(name):
+    '''
+    Function to check if name (with white space characters allowed) is only alphabets
+
+    Args:
+        name (str): patient name
+
+    Returns:
+        bool
+    '''
+    return ''.join(name.split()).isalpha()
+    
+def isDuplicateProfile(index_database, profile):
+    '''
+    Function to check if patient profile already exists, used when adding new patients
+
+    Args:
+        index_database (dict): index data
+        profile (list): list of first name, last name, gender, and birth date
+
+    Returns:
+        str
+    '''
+    key_match = ""
+    patient_ids = index_database["profile"].get(tuple(profile))
+    # get key of most recently added matched profile
+    if patient_ids:
+        key_match = next(reversed(patient_ids))
+    return key_match
+
+def isNullProfile(database, patient_id):
+    '''
+    Function to check if patient profile has been deleted given a patient ID
+
+    Args:
+        database (dict of list): patient data
+        patient_id (str)
+
+    Returns:
+        bool
+    '''
+    if database[patient_id][1:] == NULL_PROFILE:
+        return True
+    else:
+        return False
+
+def isOngoingPatient(index_database, patient_id):
+    '''
+    Function to check if patient room status is ONGOING given a patient ID
+
+    Args:
+        index_database (dict): index data
+        patient_id (str)
+        
+    Returns:
+        bool
+    '''
+    if patient_id in index_database["ongoing"]: return True
+    else: return False
+
+def get_most_recent_bed_data(index_database):
+    '''
+    Function to get most recent bed availability
+
+    Args:
+        index_database (dict): index data
+
+    Returns:
+        list, list
+    '''    
+    # current bed availability is kept in index data, no need to look into bed database
+    current = index_database["bed_current"]
+    data = list(current.values())
+    header = list(current.keys())
+
+    if data[1] == "CAPACITY":
+        data[1] = get_current_datetime_str()
+    
+    return data, header
+
+def isAvailableRoom(index_database, room_type):
+    '''
+    Function to check if room type is available
+
+    Args:
+        index_database (dict): index data
+        room_type (str)
+
+    Returns:
+        bool
+    '''
+    # get current bed count of room type
+    bed_count = index_database["bed_current"][room_type]
+    # return True if bed_count of room_type > 0
+    if bed_count > 0: return True
+    else: return False
+
+def write_journal(journal, table, row, sync=True):
+    '''
+    Function to append a changed row into journal, so changes are saved
+    without rewriting whole .csv files
+
+    Args:
+        journal (file, TableJournal, or None): journal file opened in append mode, None to skip journaling
+        table (str): table name of row (patient, room, or bed)
+        row (PatientRecord, RoomRecord, or dict): full row after change
+        sync (bool): False to leave flushing to disk to a following write
+
+    Returns:
+        None
+    '''
+    if journal is None:
+        return
+    if isinstance(row, (dict, RoomRecord)):
+        row = row.values()
+    if hasattr(journal, "write_row"):
+        # SQLite journal writes row into its table, saved when lock of database is released
+        journal.write_row(table, list(row))
+        return
+    writer = csv.writer(journal, delimiter=";")
+    writer.writerow([table, *row])
+    # make sure row is on disk before continuing
+    if sync:
+        journal.flush()
+        os.fsync(journal.fileno())
+
+def update_patient_database(database, data, index_database, journal=None):
+    '''
+    Function to update patient data
+
+    Args:
+        database (dict of list): patient data
+        data (list): new patient data to be updated into database
+        index_database (dict): index data
+        journal (file or None): journal file
+
+    Returns:
+        dict of list
+    '''
+    patient_id, first_name, last_name, gender, birth_date = data
+    if patient_id in database:
+        unindex_patient(index_database, database[patient_id])
+    database.update({
+        patient_id: PatientRecord(
+            patient_id,
+            first_name,
+            last_name,
+            gender,
+            birth_date
+        )
+    })
+    index_patient(index_database, database[patient_id])
+    write_journal(journal, "patient", database[patient_id])
+    return database
+
+def update_room_database(database, data, index_database, journal=None):
+    '''
+    Function to update room admission data
+
+    Args:
+        database (list of dict): room admission data
+        data (list): new room admission data to be updated into database
+        index_database (dict): index data
+        journal (file or None): journal file
+    
+    Returns:
+        list of dict
+    '''
+    patient_id, room_type, admission_date, discharge_date, status = data
+    new_data = RoomRecord(next_sequence(index_database, "room"),
+                          patient_id,
+                          room_type,
+                          admission_date,
+                          discharge_date,
+                          status)
+    database.append(new_data)
+    index_admission(index_database, len(database)-1, new_data)
+    write_journal(journal, "room", new_data)
+    return database
+
+def update_bed_database_count(database, changes, index_database, journal=None):
+    '''
+    Function to update bed availability data with changes of several room types at once,
+    recorded as a single bed availability row
+
+    Args:
+        database (BedHistory): bed availability data
+        changes (dict): room type -> change in bed count
+        index_database (dict): index data
+        journal (file or None): journal file
+
+    Returns:
+        BedHistory
+    '''
+    headings = database[0]
+    # assign copy of most recent data to new data
+    new_data = index_database["bed_current"].copy()
+    # set index of new data
+    new_data[headings[0]] = next_sequence(index_database, "bed")
+    # set current timestamp, formatted once for journal and display
+    epoch, offset = get_current_epoch()
+    new_data[headings[1]] = format_timestamp(epoch, offset)
+    for room_type, count in changes.items():
+        new_data[room_type] += count
+    # add new data to database
+    database.append(new_data, epoch, offset)
+    index_bed(index_database, len(database)-1, epoch)
+    index_database["bed_current"] = new_data
+    write_journal(journal, "bed", new_data)
+    return database
+
+def get_max_index(database):
+    '''
+    Function to find largest index of database which uses index as primary key
+
+    Args:
+        database (list of dict): room admission data or bed availability data
+
+    Returns
+        int
+    '''
+    if isEmptyDatabase(database):
+        return 0
+    else:
+        return max([row["Index"] for row in database[1:]])
+
+def get_max_patient_id(database):
+    '''
+    Function to find largest patient ID number in database which uses patient ID as primary key
+
+    Args:
+        database (dict of list): patient data
+
+    Returns
+        int
+    '''
+    if isEmptyDatabase(database):
+        return 0
+    # patient ID format e.g. P-1
+    # get only number part in patient_ids
+    patient_ids = [int(val[2:]) for val in list(database.keys())[1:]]
+    return max(patient_ids)
+
+def getValidName(name):
+    '''
+    Function to make sure name is capitalized and separated by single spaces
+    
+    Args:
+        name (str)
+
+    Returns:
+        str
+    '''
+    if ' ' in name:
+        tmp = [item.capitalize() for item in name.split()]
+        name = ' '.join(tmp)
+    else:
+        name =  name.capitalize()
+    return name
+
+def load_total_patient(database):
+    '''
+    Function to initialize total patient with keys from bed database keys other than Index
+
+    Args:
+        database (list of dict)
+
+    Returns:
+        dict
+    '''
+    total_patient = {}
+    for key in database[1].keys():
+        if key == "Index":
+            continue
+        total_patient[key] = None
+    total_patient["Total"] = None
+    return total_patient
+
+def update_total_patient(index_database, total_patient):
+    '''
+    Function to update total patient from ongoing patient counters in index data,
+    only needed right before total patient is displayed
+
+    Args:
+        index_database (dict): index data
+        total_patient (dict): total patient data
+
+    Returns:
+        dict
+    '''
+    occupancy = index_database["occupancy"]
+    for key in total_patient:
+        if key == "Timestamp":
+            # get current timestamp
+            total_patient[key] = get_current_datetime_str()
+
+        else:
+            total_patient[key] = occupancy.get(key, 0)
+    return total_patient
+
+### INDEX FUNCTIONS ###
+
+def load_index_database(patient_database, room_database, bed_database):
+    '''
+    Function to initialize index data from patient data, room admission data,
+    and bed availability data, to avoid scanning whole database on every lookup
+
+    Args:
+        patient_database (dict of list): patient data
+        room_database (list of dict): room admission data
+        bed_database (BedHistory): bed availability data
+
+    Returns:
+        dict
+    '''
+    # patient: column name -> value -> patient IDs having that value
+    # profile: (first name, last name, gender, birth date) -> patient IDs having that profile
+    # admission: patient ID -> positions of patient rows in room admission data
+    # ongoing: patient IDs with ONGOING status
+    # bed_time: sorted epoch timestamps of bed availability rows (excluding CAPACITY)
+    # bed_position: positions of bed availability rows in the same order as bed_time
+    # bed_current: most recent bed availability row
+    # occupancy: number of ONGOING patients of each room type and in total
+    # sequence: last allocated room index, bed index, and patient ID number
+    index_database = {"patient": {key: {} for key in PATIENT_INDEX_KEYS},
+                      "profile": {},
+                      "admission": {},
+                      "ongoing": set(),
+                      "bed_time": array("q"),
+                      "bed_position": array("q"),
+                      "bed_current": bed_database[-1],
+                      "occupancy": dict.fromkeys(bed_database[0][2:] + ["Total"], 0),
+                      "sequence": {"room": get_max_index(room_database),
+                                   "bed": max(bed_database.column("Index"), default=0),
+                                   "patient": get_max_patient_id(patient_database)}}
+    for key, row in patient_database.items():
+        if key == 'column':
+            continue
+        index_patient(index_database, row)
+    for position in range(1, len(room_database)):
+        index_admission(index_database, position, room_database[position])
+    # bed rows start after column names and CAPACITY row
+    for position, epoch in enumerate(bed_database.column("Epoch"), start=2):
+        index_bed(index_database, position, epoch)
+    return index_database
+
+def next_sequence(index_database, name):
+    '''
+    Function to allocate next value of a sequence without scanning database
+
+    Args:
+        index_database (dict): index data
+        name (str): sequence name (room, bed, or patient)
+
+    Returns:
+        int
+    '''
+    index_database["sequence"][name] += 1
+    return index_database["sequence"][name]
+
+def index_patient(index_database, row):
+    '''
+    Function to add patient row into index data, deleted (NULL) profiles are not indexed
+
+    Args:
+        index_database (dict): index data
+        row (list): patient row
+
+    Returns:
+        None
+    '''
+    if row[1:] == NULL_PROFILE:
+        return
+    patient_id = row[0]
+    number = int(patient_id[2:])
+    for key, value in zip(PATIENT_INDEX_KEYS, row[1:]):
+        # dict is used as an ordered set of patient IDs, kept in patient ID order,
+        # new patients come last and only a modified patient is added out of order
+        patient_ids = index_database["patient"][key].setdefault(value, {})
+        if patient_ids and int(next(reversed(patient_ids))[2:]) > number:
+            patient_ids[patient_id] = None
+            index_database["patient"][key][value] = dict.fromkeys(
+                sorted(patient_ids, key=lambda patient_id: int(patient_id[2:])))
+        else:
+            patient_ids[patient_id] = None
+    index_database["profile"].setdefault(tuple(row[1:]), {})[patient_id] = None
+
+def unindex_patient(index_database, row):
+    '''
+    Function to remove patient row from index data, called before the row is modified
+
+    Args:
+        index_database (dict): index data
+        row (list): patient row
+
+    Returns:
+        None
+    '''
+    patient_id = row[0]
+    for key, value in zip(PATIENT_INDEX_KEYS, row[1:]):
+        patient_ids = index_database["patient"][key].get(value)
+        if patient_ids is None:
+            continue
+        patient_ids.pop(patient_id, None)
+        if not patient_ids:
+            del index_database["patient"][key][value]
+    profile = tuple(row[1:])
+    patient_ids = index_database["profile"].get(profile)
+    if patient_ids is not None:
+        patient_ids.pop(patient_id, None)
+        if not patient_ids:
+            del index_database["profile"][profile]
+
+def search_patient(database, index_database, key, val):
+    '''
+    Function to get patient rows where column key equals val using index data
+
+    Args:
+        database (dict of list): patient data
+        index_database (dict): index data
+        key (str): column name of val
+        val
+
+    Returns:
+        list
+    '''
+    if key == "Patient_ID":
+        if val in database and val != 'column': return [database[val]]
+        else: return []
+    # patient IDs are kept in patient ID order of patient data by index_patient
+    patient_ids = index_database["patient"][key].get(val, {})
+    return [database[patient_id] for patient_id in patient_ids]
+
+def index_admission(index_database, position, row):
+    '''
+    Function to add room admission row into index data
+
+    Args:
+        index_database (dict): index data
+        position (int): position of row in room admission data
+        row (dict): room admission row
+
+    Returns:
+        None
+    '''
+    patient_id = row["Patient_ID"]
+    index_database["admission"].setdefault(patient_id, []).append(position)
+    if row["Status"] == "ONGOING":
+        index_database["ongoing"].add(patient_id)
+        update_occupancy(index_database, row["Room_Type"], 1)
+
+def update_occupancy(index_database, room_type, count):
+    '''
+    Function to add count into ONGOING patient counters of a room type and total
+
+    Args:
+        index_database (dict): index data
+        room_type (str)
+        count (int): 1 when patient checks in, -1 when patient checks out
+
+    Returns:
+        None
+    '''
+    occupancy = index_database["occupancy"]
+    occupancy[room_type] = occupancy.get(room_type, 0) + count
+    occupancy["Total"] += count
+
+def isValidOccupancy(index_database, room_database):
+    '''
+    Function to check if ONGOING patient counters match room admission data,
+    by counting ONGOING rows of room admission data
+
+    Args:
+        index_database (dict): index data
+        room_database (list of dict): room admission data
+
+    Returns:
+        bool
+    '''
+    occupancy = dict.fromkeys(index_database["occupancy"], 0)
+    for row in room_database[1:]:
+        if row["Status"] == "ONGOING":
+            occupancy[row["Room_Type"]] = occupancy.get(row["Room_Type"], 0) + 1
+            occupancy["Total"] += 1
+    if occupancy == index_database["occupancy"]: return True
+    else: return False
+
+def update_index_status(index_database, room_database, patient_id):
+    '''
+    Function to refresh ONGOING status of a patient in index data after its room status changes
+
+    Args:
+        index_database (dict): index data
+        room_database (list of dict): room admission data
+        patient_id (str)
+
+    Returns:
+        None
+    '''
+    # only rows of the given patient are checked
+    for position in index_database["admission"].get(patient_id, []):
+        if room_database[position]["Status"] == "ONGOING":
+            index_database["ongoing"].add(patient_id)
+            return
+    index_database["ongoing"].discard(patient_id)
+
+def index_bed(index_database, position, epoch):
+    '''
+    Function to add bed availability row into index data, keeping bed_time sorted
+
+    Args:
+        index_database (dict): index data
+        position (int): position of row in bed availability data
+        epoch (int): timestamp of row in seconds since epoch
+
+    Returns:
+        None
+    '''
+    bed_time = index_database["bed_time"]
+    # new rows are usually the most recent, so this is an append
+    i = bisect.bisect_right(bed_time, epoch)
+    if i == len(bed_time):
+        bed_time.append(epoch)
+        index_database["bed_position"].append(position)
+    else:
+        bed_time.insert(i, epoch)
+        index_database["bed_position"].insert(i, position)
+
+def search_bed_range(database, index_database, start_epoch, end_epoch):
+    '''
+    Function to get bed availability rows with timestamp between start and end (inclusive)
+
+    Args:
+        database (BedHistory): bed availability data
+        index_database (dict): index data
+        start_epoch (int)
+        end_epoch (int)
+
+    Returns:
+        list of dict
+    '''
+    bed_time = index_database["bed_time"]
+    start = bisect.bisect_left(bed_time, start_epoch)
+    end = bisect.bisect_right(bed_time, end_epoch)
+    return [database[position] for position in index_database["bed_position"][start:end]]
+
+def get_lowest_bed_data(database, index_database, start_epoch, end_epoch):
+    '''
+    Function to get lowest bed count of each room type with timestamp between start and end (inclusive),
+    computed directly over bed count columns
+
+    Args:
+        database (BedHistory): bed availability data
+        index_database (dict): index data
+        start_epoch (int)
+        end_epoch (int)
+
+    Returns:
+        dict: room type -> lowest bed count, empty if there is no row in range
+    '''
+    bed_time = index_database["bed_time"]
+    start = bisect.bisect_left(bed_time, start_epoch)
+    end = bisect.bisect_right(bed_time, end_epoch)
+    if start == end:
+        return {}
+    positions = index_database["bed_position"][start:end]
+    first, last = min(positions) - 2, max(positions) - 2
+
+    lowest = {}
+    for key in database.headings[2:]:
+        column = database.column(key)
+        if last - first == end - start - 1:
+            # rows in range are next to each other, which is the usual case
+            lowest[key] = min(column[first:last+1])
+        else:
+            lowest[key] = min(column[position-2] for position in positions)
+    return lowest
+
+def search_bed_at(database, index_database, epoch):
+    '''
+    Function to get bed availability at a point in time,
+    which is the most recent row at or before epoch, or CAPACITY row if there is none
+
+    Args:
+        database (BedHistory): bed availability data
+        index_database (dict): index data
+        epoch (int)
+
+    Returns:
+        dict
+    '''
+    i = bisect.bisect_right(index_database["bed_time"], epoch)
+    if i == 0:
+        return database[1]
+    return database[index_database["bed_position"][i-1]]
+
+def search_room_position(room_database, index):
+    '''
+    Function to find position of room admission row given its index,
+    rows are added in index order so binary search is tried first
+
+    Args:
+        room_database (list of dict): room admission data
+        index (int): Index column of row
+
+    Returns:
+        int or None: position of row, None if there is no row with that index
+    '''
+    low, high = 1, len(room_database)
+    while low < high:
+        middle = (low + high) // 2
+        if room_database[middle]["Index"] < index:
+            low = middle + 1
+        else:
+            high = middle
+    if low < len(room_database) and room_database[low]["Index"] == index:
+        return low
+    for position in range(1, len(room_database)):
+        if room_database[position]["Index"] == index:
+            return position
+    return None
+
+### BATCH FUNCTIONS ###
+
+def get_valid_profile(row):
+    '''
+    Function to validate and normalize patient profile, using the same rules as patient input menus
+
+    Args:
+        row (dict): First_Name, Last_Name, Gender, and Birth_Date
+
+    Returns:
+        list or None, str: first name, last name, gender, and birth date,
+        or None and rejection reason if profile is invalid
+    '''
+    profile = []
+    for key in ["First_Name", "Last_Name"]:
+        name = str(row.get(key) or "")
+        if not isAlphaName(name) or "NULL" in name:
+            return None, f"invalid {key} {name!r}"
+        profile.append(getValidName(name))
+    gender = str(row.get("Gender") or "").capitalize()
+    if gender not in ["Male", "Female"]:
+        return None, f"invalid Gender {gender!r}"
+    profile.append(gender)
+    try:
+        profile.append(date_to_str(datetime.strptime(str(row.get("Birth_Date")), DATE_FORMAT)))
+    except ValueError:
+        return None, f"invalid Birth_Date {row.get('Birth_Date')!r}"
+    return profile, ""
+
+def get_valid_admission(row, patient_database, index_database):
+    '''
+    Function to validate a row of admission import file, using the same checks as add new admission menu
+
+    Args:
+        row (dict): Patient_ID for returning patient, or First_Name, Last_Name, Gender, and Birth_Date
+                    for new patient, and Room_Type
+        patient_database (dict of list): patient data
+        index_database (dict): index data
+
+    Returns:
+        list or None, str: patient data (new patient) or None (returning patient), and room type,
+        or None and rejection reason if row is invalid
+    '''
+    if not isinstance(row, dict):
+        return None, "row is not an object of column names"
+    room_type = '_'.join(str(row.get("Room_Type") or "").split())
+    if room_type not in index_database["occupancy"] or room_type == "Total":
+        return None, f"invalid room type {room_type!r}"
+
+    patient_id = str(row.get("Patient_ID") or "").strip().capitalize()
+    if patient_id:
+        if not re.fullmatch(PATIENT_ID_FORMAT, patient_id):
+            return None, f"invalid patient ID {patient_id!r}"
+        if patient_id not in patient_database:
+            return None, f"patient ID {patient_id} does not exist"
+        if isNullProfile(patient_database, patient_id):
+            return None, f"{patient_id} is a deleted patient ID"
+        if isOngoingPatient(index_database, patient_id):
+            return None, f"{patient_id} is an ONGOING patient"
+        return [patient_id, room_type], ""
+
+    profile, reason = get_valid_profile(row)
+    if profile is None:
+        return None, reason
+
+    key_match = isDuplicateProfile(index_database, profile)
+    if key_match:
+        return None, f"profile already exists under Patient ID {key_match}"
+    return [None] + profile + [room_type], ""
+
+def import_admissions(rows, patient_database, room_database, bed_database, index_database, journal=None,
+                      available=None):
+    '''
+    Function to admit patients from import rows without prompting,
+    bed availability is updated once for the whole import
+
+    Args:
+        rows (iterable of tuple): line number, row (see get_valid_admission) or None if line cannot be read,
+                                  and reason why it cannot be read, as given by read_admission_file
+        patient_database (dict of list): patient data
+        room_database (list of dict): room admission data
+        bed_database (BedHistory): bed availability data
+        index_database (dict): index data
+        journal (file or None): journal file
+        available (dict or None): free beds of each room type, current bed availability if None
+
+    Returns:
+        int, list: number of admitted patients, and (line number, reason) of rejected rows
+    '''
+    admitted = 0
+    rejected = []
+    # bed changes of this import, applied once at the end
+    changes = {}
+    changed_rows = []
+    admission_date = get_current_date_str()
+    if available is None:
+        available = index_database["bed_current"]
+
+    for line, row, reason in rows:
+        if row is None:
+            rejected.append((line, reason))
+            continue
+        data, reason = get_valid_admission(row, patient_database, index_database)
+        if data is None:
+            rejected.append((line, reason))
+            continue
+
+        room_type = data[-1]
+        if available[room_type] + changes.get(room_type, 0) <= 0:
+            rejected.append((line, f"room type {room_type} is not available"))
+            continue
+
+        if len(data) == 2:
+            patient_id = data[0]
+        else:
+            patient_id = f"P-{next_sequence(index_database, 'patient')}"
+            patient_database = update_patient_database(patient_database, [patient_id] + data[1:5], index_database)
+            changed_rows.append(("patient", patient_database[patient_id]))
+
+        room_data = [patient_id, room_type, admission_date, "N/A", "ONGOING"]
+        room_database = update_room_database(room_database, room_data, index_database)
+        changed_rows.append(("room", room_database[-1]))
+        changes[room_type] = changes.get(room_type, 0) - 1
+        admitted += 1
+
+    if admitted:
+        # journal is flushed to disk once, by the bed row
+        for table, row in changed_rows:
+            write_journal(journal, table, row, sync=False)
+        bed_database = update_bed_database_count(bed_database, changes, index_database, journal)
+    return admitted, rejected
+
+### STORE ###
+
+class AdmissionError(Exception):
+    '''
+    Error raised when an operation of AdmissionStore is rejected, with the reason as message
+    '''
+
+class AdmissionStore:
+    '''
+    Patient, room admission, and bed availability data with their index data,
+    changed through admit, discharge, transfer, modify, and delete without prompting or printing.
+
+    Every change is written into journal (if any) the same way the menus do.
+    Operations can be called from several threads at once: a free bed is taken from its room type
+    under that room type's lock before anything is written, so a bed is never given twice,
+    and data is changed under a single lock held only while rows are written in memory.
+
+    With shared data files, other processes may work on the same data: before every change,
+    the lock of data files is taken and changes of other processes are read from journal.
+
+    Args:
+        patient_database (dict of list): patient data
+        room_database (list of dict): room admission data
+        bed_database (BedHistory): bed availability data
+        journal (file or None): journal file opened in append mode, None to skip journaling
+        shared (SharedData, SqliteData, or None): data files shared with other processes, journal of shared is used
+    '''
+    def __init__(self, patient_database, room_database, bed_database, journal=None, shared=None):
+        self.patient_database = patient_database
+        self.room_database = room_database
+        self.bed_database = bed_database
+        self.index_database = load_index_database(patient_database, room_database, bed_database)
+        self.total_patient = load_total_patient(bed_database)
+        self.shared = shared
+        self.journal = shared.journal if shared else journal
+        # lock of data, index data, and journal
+        self.lock = threading.Lock()
+        # free beds of each room type, including beds taken by operations not yet written
+        self.room_locks = {key: threading.Lock() for key in bed_database.headings[2:]}
+        self.free_beds = {key: self.index_database["bed_current"][key] for key in bed_database.headings[2:]}
+        # batch state of each thread, see batch
+        self.local = threading.local()
+
+    @contextmanager
+    def changing(self):
+        '''
+        Context to change data while holding lock, and with shared data files,
+        also holding lock of data files after changes of other processes are read
+        '''
+        with self.lock:
+            if self.shared is None:
+                yield
+                return
+            with self.shared:
+                self.apply_changes()
+                try:
+                    yield
+                finally:
+                    self.shared.mark_written()
+
+    def refresh(self):
+        '''
+        Function to read changes written by other processes into memory, used before displaying data
+
+        Args:
+            None
+
+        Returns:
+            None
+        '''
+        if self.shared is not None:
+            with self.changing():
+                pass
+
+    def apply_changes(self):
+        '''
+        Function to apply changes of other processes, called while holding lock of data files
+
+        Args:
+            None
+
+        Returns:
+            None
+        '''
+        before = dict(self.index_database["bed_current"])
+        rows = self.shared.read_changes()
+        if rows is None:
+            self.reload(*self.shared.load())
+        else:
+            for row in rows:
+                self.apply_row(row[0], row[1:])
+        # beds taken by other processes are no longer free here
+        for key in self.free_beds:
+            with self.room_locks[key]:
+                self.free_beds[key] += self.index_database["bed_current"][key] - before[key]
+
+    def apply_row(self, table, row):
+        '''
+        Function to apply a journal row written by another process, keeping index data updated
+
+        Args:
+            table (str): table name of row (patient, room, or bed)
+            row (list): row read from journal
+
+        Returns:
+            None
+        '''
+        sequence = self.index_database["sequence"]
+        if table == "patient":
+            patient_row = parse_patient_row(row)
+            update_patient_database(self.patient_database, patient_row, self.index_database)
+            sequence["patient"] = max(sequence["patient"], int(patient_row[0][2:]))
+
+        elif table == "room":
+            room_row = parse_room_row(row)
+            patient_id = room_row["Patient_ID"]
+            # rows with index above room sequence are new
+            position = None
+            if room_row["Index"] <= sequence["room"]:
+                position = search_room_position(self.room_database, room_row["Index"])
+            if position is None:
+                self.room_database.append(room_row)
+                index_admission(self.index_database, len(self.room_database)-1, room_row)
+                sequence["room"] = max(sequence["room"], room_row["Index"])
+                return
+            old_row = self.room_database[position]
+            if old_row["Status"] == "ONGOING":
+                update_occupancy(self.index_database, old_row["Room_Type"], -1)
+            if room_row["Status"] == "ONGOING":
+                update_occupancy(self.index_database, room_row["Room_Type"], 1)
+            self.room_database[position] = room_row
+            update_index_status(self.index_database, self.room_database, patient_id)
+
+        elif table == "bed":
+            bed_row = parse_bed_row(self.bed_database.headings, row)
+            if bed_row["Index"] <= sequence["bed"]:
+                return
+            self.bed_database.append(bed_row)
+            # timestamp is parsed once when row is added
+            index_bed(self.index_database, len(self.bed_database)-1, self.bed_database.column("Epoch")[-1])
+            self.index_database["bed_current"] = bed_row
+            sequence["bed"] = bed_row["Index"]
+
+    def reload(self, patient_database, room_database, bed_database):
+        '''
+        Function to replace all data after base .csv files are rewritten by another process,
+        keeping the same objects so references held by menus stay valid
+
+        Args:
+            patient_database (dict of list): patient data
+            room_database (list of dict): room admission data
+            bed_database (BedHistory): bed availability data
+
+        Returns:
+            None
+        '''
+        self.patient_database.clear()
+        self.patient_database.update(patient_database)
+        self.room_database[:] = room_database
+        self.bed_database.load(bed_database)
+        self.index_database.clear()
+        self.index_database.update(load_index_database(self.patient_database, self.room_database,
+                                                       self.bed_database))
+
+    def compact(self, min_size=0):
+        '''
+        Function to write all data into base .csv files and empty the journal,
+        if journal has grown to at least min_size bytes
+
+        Args:
+            min_size (int)
+
+        Returns:
+            bool: True if data is written
+        '''
+        if self.shared is None:
+            raise AdmissionError("Data files are not known, cannot write data.")
+        # size is checked first under lock only, lock of data files is taken once compaction is due
+        with self.lock:
+            if self.shared.get_journal_size() < min_size:
+                return False
+        with self.changing():
+            if self.shared.get_journal_size() < min_size:
+                return False
+            self.shared.compact(self.patient_database, self.room_database, self.bed_database)
+        return True
+
+    def check_room_type(self, room_type):
+        '''
+        Function to check if room type is one of the room types of bed availability data
+
+        Args:
+            room_type (str)
+
+        Returns:
+            None
+        '''
+        if room_type not in self.room_locks:
+            raise AdmissionError(f"Invalid room type {room_type}.")
+
+    def take_bed(self, room_type):
+        '''
+        Function to take a free bed of a room type, checked and decremented at once
+
+        Args:
+            room_type (str)
+
+        Returns:
+            None
+        '''
+        with self.room_locks[room_type]:
+            if self.free_beds[room_type] <= 0:
+                raise AdmissionError(f"Room type {room_type} is not available.")
+            self.free_beds[room_type] -= 1
+
+    def check_taken_bed(self, room_type):
+        '''
+        Function to check if bed taken by take_bed is still free after changes of other processes are read,
+        called while holding lock
+
+        Args:
+            room_type (str)
+
+        Returns:
+            None
+        '''
+        if self.free_beds[room_type] < 0:
+            raise AdmissionError(f"Room type {room_type} is not available.")
+
+    def give_bed(self, room_type):
+        '''
+        Function to give back a bed of a room type, after discharge or a failed operation
+
+        Args:
+            room_type (str)
+
+        Returns:
+            None
+        '''
+        with self.room_locks[room_type]:
+            self.free_beds[room_type] += 1
+
+    def write_bed(self, changes):
+        '''
+        Function to add bed availability row with changes of bed count, called while holding lock
+
+        Args:
+            changes (dict): room type -> change in bed count
+
+        Returns:
+            None
+        '''
+        update_bed_database_count(self.bed_database, changes, self.index_database)
+        write_journal(self.journal, "bed", self.index_database["bed_current"], sync=False)
+
+    def sync_journal(self):
+        '''
+        Function to make sure journal rows written so far are on disk,
+        disk write is done outside lock so rows of other threads are flushed together
+
+        Args:
+            None
+
+        Returns:
+            None
+        '''
+        # rows of SQLite journal are on disk once lock of database is released
+        if self.journal is None or getattr(self.local, "isBatch", False) or not hasattr(self.journal, "fileno"):
+            return
+        with self.lock:
+            self.journal.flush()
+        os.fsync(self.journal.fileno())
+
+    @contextmanager
+    def batch(self):
+        '''
+        Context to run several operations on this thread with journal written to disk once at the end,
+        instead of after every operation
+        '''
+        self.local.isBatch = True
+        try:
+            yield
+        finally:
+            self.local.isBatch = False
+            self.sync_journal()
+
+    def get_patient(self, patient_id):
+        '''
+        Function to get patient row of an existing, not deleted patient
+
+        Args:
+            patient_id (str)
+
+        Returns:
+            PatientRecord
+        '''
+        if patient_id not in self.patient_database or patient_id == "column":
+            raise AdmissionError(f"Patient ID {patient_id} does not exist.")
+        if isNullProfile(self.patient_database, patient_id):
+            raise AdmissionError(f"{patient_id} is a deleted patient ID.")
+        return self.patient_database[patient_id]
+
+    def get_next_patient_id(self):
+        '''
+        Function to get patient ID the next new patient will be given, without allocating it
+
+        Args:
+            None
+
+        Returns:
+            str
+        '''
+        return f"P-{self.index_database['sequence']['patient'] + 1}"
+
+    def get_ongoing_position(self, patient_id):
+        '''
+        Function to get position of ONGOING room admission row of a patient
+
+        Args:
+            patient_id (str)
+
+        Returns:
+            int
+        '''
+        for position in reversed(self.index_database["admission"].get(patient_id, [])):
+            if self.room_database[position]["Status"] == "ONGOING":
+                return position
+        raise AdmissionError(f"{patient_id} has no ONGOING room admission.")
+
+    def admit(self, room_type, patient_id=None, profile=None, allow_duplicate=False):
+        '''
+        Function to admit a patient into a room type,
+        a returning patient given patient_id, or a new patient given profile
+
+        Args:
+            room_type (str)
+            patient_id (str or None): patient ID of returning patient
+            profile (list or None): first name, last name, gender, and birth date of new patient
+            allow_duplicate (bool): True to add new patient even if profile already exists
+
+        Returns:
+            str: patient ID of admitted patient
+        '''
+        self.check_room_type(room_type)
+        if patient_id is None:
+            # a string would be zipped one character per field, so the shape is checked first
+            if not isinstance(profile, (list, tuple)) or len(profile) != len(PATIENT_INDEX_KEYS):
+                raise AdmissionError(f"Patient profile must be a list of {', '.join(PATIENT_INDEX_KEYS)}, "
+                                     f"got {profile!r}.")
+            profile, reason = get_valid_profile(dict(zip(PATIENT_INDEX_KEYS, profile)))
+            if profile is None:
+                raise AdmissionError(f"Patient profile has {reason}.")
+
+        self.take_bed(room_type)
+        # taken bed is given back if the operation fails for any reason before bed row is added
+        isBedWritten = False
+        try:
+            with self.changing():
+                self.check_taken_bed(room_type)
+                if patient_id is None:
+                    key_match = isDuplicateProfile(self.index_database, profile)
+                    if key_match and not allow_duplicate:
+                        raise AdmissionError(f"Patient profile already exists under Patient ID {key_match}.")
+                    patient_id = f"P-{next_sequence(self.index_database, 'patient')}"
+                    update_patient_database(self.patient_database, [patient_id] + profile, self.index_database)
+                    write_journal(self.journal, "patient", self.patient_database[patient_id], sync=False)
+                else:
+                    self.get_patient(patient_id)
+                    if isOngoingPatient(self.index_database, patient_id):
+                        raise AdmissionError("Cannot add new visit for ONGOING patient.")
+
+                room_data = [patient_id, room_type, get_current_date_str(), "N/A", "ONGOING"]
+                update_room_database(self.room_database, room_data, self.index_database)
+                write_journal(self.journal, "room", self.room_database[-1], sync=False)
+                self.write_bed({room_type: -1})
+                isBedWritten = True
+        finally:
+            if not isBedWritten:
+                self.give_bed(room_type)
+        self.sync_journal()
+        return patient_id
+
+    def import_admissions(self, rows):
+        '''
+        Function to admit patients from import rows, see import_admissions
+
+        Args:
+            rows (iterable of tuple): line number, row, and reason, as given by read_admission_file
+
+        Returns:
+            int, list: number of admitted patients, and (line number, reason) of rejected rows
+        '''
+        with self.changing():
+            # no bed can be taken by another thread during import,
+            # room locks are always taken after lock to avoid deadlock
+            for key in sorted(self.room_locks):
+                self.room_locks[key].acquire()
+            try:
+                before = dict(self.index_database["bed_current"])
+                result = import_admissions(rows, self.patient_database, self.room_database, self.bed_database,
+                                           self.index_database, self.journal, available=self.free_beds)
+                for key in self.free_beds:
+                    self.free_beds[key] += self.index_database["bed_current"][key] - before[key]
+            finally:
+                for key in sorted(self.room_locks, reverse=True):
+                    self.room_locks[key].release()
+        return result
+
+    def discharge(self, patient_id):
+        '''
+        Function to mark ONGOING room admission of a patient as COMPLETED, freeing its bed
+
+        Args:
+            patient_id (str)
+
+        Returns:
+            RoomRecord: changed room admission row
+        '''
+        with self.changing():
+            row = self.room_database[self.get_ongoing_position(patient_id)]
+            room_type = row["Room_Type"]
+            row["Discharge_Date"] = get_current_date_str()
+            row["Status"] = "COMPLETED"
+            update_occupancy(self.index_database, room_type, -1)
+            update_index_status(self.index_database, self.room_database, patient_id)
+            write_journal(self.journal, "room", row, sync=False)
+            self.write_bed({room_type: 1})
+        self.give_bed(room_type)
+        self.sync_journal()
+        return row
+
+    def transfer(self, patient_id, room_type):
+        '''
+        Function to move ONGOING patient into another room type
+
+        Args:
+            patient_id (str)
+            room_type (str): new room type
+
+        Returns:
+            RoomRecord: changed room admission row
+        '''
+        self.check_room_type(room_type)
+        self.take_bed(room_type)
+        isBedWritten = False
+        try:
+            with self.changing():
+                self.check_taken_bed(room_type)
+                row = self.room_database[self.get_ongoing_position(patient_id)]
+                old_room_type = row["Room_Type"]
+                if room_type == old_room_type:
+                    raise AdmissionError(f"{patient_id} is already in room type {room_type}.")
+                row["Room_Type"] = room_type
+                update_occupancy(self.index_database, old_room_type, -1)
+                update_occupancy(self.index_database, room_type, 1)
+                write_journal(self.journal, "room", row, sync=False)
+                self.write_bed({old_room_type: 1, room_type: -1})
+                isBedWritten = True
+        finally:
+            if not isBedWritten:
+                self.give_bed(room_type)
+        self.give_bed(old_room_type)
+        self.sync_journal()
+        return row
+
+    def modify(self, patient_id, key, value):
+        '''
+        Function to change a profile column of a patient
+
+        Args:
+            patient_id (str)
+            key (str): column name (First_Name, Last_Name, Gender, or Birth_Date)
+            value (str): new value
+
+        Returns:
+            PatientRecord: changed patient row
+        '''
+        if key not in PATIENT_INDEX_KEYS:
+            raise AdmissionError(f"Invalid column {key}.")
+        with self.changing():
+            row = self.get_patient(patient_id)
+            profile = dict(zip(PATIENT_INDEX_KEYS, row[1:]))
+            profile[key] = value
+            profile, reason = get_valid_profile(profile)
+            if profile is None:
+                raise AdmissionError(f"Patient profile has {reason}.")
+            unindex_patient(self.index_database, row)
+            row[PATIENT_INDEX_KEYS.index(key) + 1] = profile[PATIENT_INDEX_KEYS.index(key)]
+            index_patient(self.index_database, row)
+            write_journal(self.journal, "patient", row, sync=False)
+        self.sync_journal()
+        return row
+
+    def delete(self, patient_id):
+        '''
+        Function to delete a patient, setting its profile and room admission rows to NULL
+
+        Args:
+            patient_id (str)
+
+        Returns:
+            list: positions of changed room admission rows
+        '''
+        with self.changing():
+            self.get_patient(patient_id)
+            if isOngoingPatient(self.index_database, patient_id):
+                raise AdmissionError("Cannot delete ONGOING patient. Please mark status as COMPLETED first.")
+            update_patient_database(self.patient_database, [patient_id] + NULL_PROFILE, self.index_database)
+            write_journal(self.journal, "patient", self.patient_database[patient_id], sync=False)
+            positions = list(self.index_database["admission"].get(patient_id, []))
+            for position in positions:
+                self.room_database[position]["Status"] = "NULL"
+                write_journal(self.journal, "room", self.room_database[position], sync=False)
+            update_index_status(self.index_database, self.room_database, patient_id)
+        self.sync_journal()
+        return positions
+
+    def query(self, key, value, table="patient"):
+        '''
+        Function to get rows where column key equals value
+
+        Args:
+            key (str): column name
+            value
+            table (str): patient or room
+
+        Returns:
+            list: patient rows or room admission rows
+        '''
+        with self.lock:
+            # indexed lookups read matching rows only, other columns of room data are scanned
+            if table == "patient" and key in self.patient_database['column']:
+                rows = search_patient(self.patient_database, self.index_database, key, value)
+                add_rows(len(rows))
+                return rows
+            if table == "room" and key == "Patient_ID":
+                rows = [self.room_database[position]
+                        for position in self.index_database["admission"].get(value, [])]
+                add_rows(len(rows))
+                return rows
+            if table == "room" and key in self.room_database[0]:
+                add_rows(len(self.room_database) - 1)
+                return [row for row in self.room_database[1:] if row[key] == value]
+        raise AdmissionError(f"Invalid column {key} of {table} data.")
+
+    def availability(self):
+        '''
+        Function to get current bed count of each room type
+
+        Args:
+            None
+
+        Returns:
+            dict: room type -> bed count
+        '''
+        # index data is emptied and built again while lock is held when another process rewrites data files
+        with self.lock:
+            current = self.index_database["bed_current"]
+            return {key: current[key] for key in self.bed_database.headings[2:]}
+
+    def census(self):
+        '''
+        Function to get current number of ONGOING patients of each room type and in total
+
+        Args:
+            None
+
+        Returns:
+            dict: total patient data
+        '''
+        with self.lock:
+            return dict(update_total_patient(self.index_database, self.total_patient))
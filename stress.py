@@ -0,0 +1,268 @@
+import sys
+import os
+import random
+import tempfile
+import threading
+import multiprocessing
+import time
+
+from store import AdmissionStore, AdmissionError, isValidOccupancy
+from storage import SharedData, replay_journal, dict_of_list_to_csv, list_of_dict_to_csv
+from sqlitedata import SqliteData
+from bedhistory import BedHistory
+
+BED_HEADINGS = ["Index", "Timestamp", "VVIP", "VIP", "Kelas_1", "Kelas_2", "Kelas_3"]
+# small capacities, so threads keep running out of beds
+CAPACITY = {"VVIP": 2, "VIP": 3, "Kelas_1": 5, "Kelas_2": 8, "Kelas_3": 13}
+# lock of operation counts shared by desks
+COUNTS_LOCK = threading.Lock()
+# journal size in bytes before desks on separate processes write it into base files,
+# small so base files are rewritten while other processes are working
+COMPACT_SIZE = 16 * 1024
+
+def new_database():
+    '''
+    Function to create empty patient, room admission, and bed availability data with CAPACITY row
+
+    Args:
+        None
+
+    Returns:
+        dict of list, list of dict, BedHistory
+    '''
+    patient_database = {"column": ["Patient_ID", "First_Name", "Last_Name", "Gender", "Birth_Date"]}
+    room_database = [["Index", "Patient_ID", "Room_Type", "Admission_Date", "Discharge_Date", "Status"]]
+    bed_database = BedHistory(BED_HEADINGS)
+    bed_database.append({"Index": 0, "Timestamp": "CAPACITY", **CAPACITY})
+    return patient_database, room_database, bed_database
+
+def open_shared(directory, isSqlite=False):
+    '''
+    Function to open data files in directory
+
+    Args:
+        directory (str)
+        isSqlite (bool): True to open SQLite database instead of .csv files
+
+    Returns:
+        SharedData or SqliteData
+    '''
+    if isSqlite:
+        return SqliteData(os.path.join(directory, "admission.db"))
+    csv_paths = [os.path.join(directory, name) for name in ["patient_data.csv", "room_data.csv", "bed_data.csv"]]
+    return SharedData(csv_paths, os.path.join(directory, "journal_data.csv"))
+
+def run_desk(store, seed, n_operations, counts):
+    '''
+    Function to run random admissions, transfers, and discharges as one admission desk,
+    writing journal into base files from time to time if store has shared data files
+
+    Args:
+        store (AdmissionStore)
+        seed (int): seed of random operations
+        n_operations (int)
+        counts (dict): operation name -> number of accepted operations, updated in place
+
+    Returns:
+        None
+    '''
+    rand = random.Random(seed)
+    room_types = list(CAPACITY)
+    ongoing = []
+    accepted = {"admit": 0, "transfer": 0, "discharge": 0, "rejected": 0}
+    for i in range(n_operations):
+        operation = rand.random()
+        try:
+            if operation < 0.5 or not ongoing:
+                profile = [f"Desk {chr(65 + seed % 26)}", f"Patient {''.join(chr(97 + int(d)) for d in str(i))}",
+                           rand.choice(["Male", "Female"]), "1990-01-01"]
+                ongoing.append(store.admit(rand.choice(room_types), profile=profile, allow_duplicate=True))
+                accepted["admit"] += 1
+            elif operation < 0.7:
+                store.transfer(rand.choice(ongoing), rand.choice(room_types))
+                accepted["transfer"] += 1
+            else:
+                store.discharge(ongoing.pop(rand.randrange(len(ongoing))))
+                accepted["discharge"] += 1
+        except AdmissionError:
+            accepted["rejected"] += 1
+        if store.shared and i % 50 == 0:
+            store.compact(min_size=COMPACT_SIZE)
+    with COUNTS_LOCK:
+        for key, value in accepted.items():
+            counts[key] = counts.get(key, 0) + value
+
+def check_store(store, journal_path=None):
+    '''
+    Function to check that no bed is given twice, and journal gives back the same data
+
+    Args:
+        store (AdmissionStore)
+        journal_path (str or None): path to journal of store, None to skip checking journal
+
+    Returns:
+        list: description of each broken rule, empty if store is consistent
+    '''
+    errors = []
+    ongoing = dict.fromkeys(CAPACITY, 0)
+    ongoing_patients = {}
+    for row in store.room_database[1:]:
+        if row["Status"] == "ONGOING":
+            ongoing[row["Room_Type"]] += 1
+            ongoing_patients[row["Patient_ID"]] = ongoing_patients.get(row["Patient_ID"], 0) + 1
+
+    current = store.availability()
+    for room_type, capacity in CAPACITY.items():
+        if ongoing[room_type] > capacity:
+            errors.append(f"{room_type}: {ongoing[room_type]} ONGOING patients for {capacity} beds")
+        if current[room_type] != capacity - ongoing[room_type]:
+            errors.append(f"{room_type}: {current[room_type]} free beds, expected {capacity - ongoing[room_type]}")
+        if store.free_beds[room_type] != current[room_type]:
+            errors.append(f"{room_type}: {store.free_beds[room_type]} beds left taken after all desks finished")
+        column = store.bed_database.column(room_type)
+        if column and (min(column) < 0 or max(column) > capacity):
+            errors.append(f"{room_type}: bed count out of range in bed availability history")
+
+    for patient_id, count in ongoing_patients.items():
+        if count > 1:
+            errors.append(f"{patient_id}: {count} ONGOING room admissions")
+    if not isValidOccupancy(store.index_database, store.room_database):
+        errors.append("ONGOING patient counters do not match room admission data")
+    if journal_path is None:
+        return errors
+
+    patient_database, room_database, bed_database = new_database()
+    replay_journal(journal_path, patient_database, room_database, bed_database)
+    if (patient_database != store.patient_database or room_database != store.room_database
+            or bed_database != store.bed_database):
+        errors.append("journal does not give back the same data")
+
+    # a row torn by a crash while it was appended is cut off instead of applied
+    size = os.path.getsize(journal_path)
+    with open(journal_path, "a", newline='') as file:
+        file.write("bed;999999;2026-10-18T02:0")
+    patient_database, room_database, bed_database = new_database()
+    replay_journal(journal_path, patient_database, room_database, bed_database)
+    if bed_database != store.bed_database:
+        errors.append("torn journal row is applied")
+    if os.path.getsize(journal_path) != size:
+        errors.append("torn journal row is not cut off")
+    return errors
+
+def run_stress(n_threads, n_operations):
+    '''
+    Function to run admission desks on separate threads against one store and check the result
+
+    Args:
+        n_threads (int)
+        n_operations (int): operations per thread
+
+    Returns:
+        float, dict, list: operations per second, accepted operation counts, and broken rules
+    '''
+    journal = tempfile.NamedTemporaryFile("w", suffix=".csv", newline='', delete=False)
+    store = AdmissionStore(*new_database(), journal=journal)
+    counts = {}
+    threads = [threading.Thread(target=run_desk, args=(store, seed, n_operations, counts))
+               for seed in range(n_threads)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - start
+    journal.close()
+    errors = check_store(store, journal.name)
+    os.remove(journal.name)
+
+    return n_threads * n_operations / duration, counts, errors
+
+def run_process_desk(directory, seed, n_operations, queue, isSqlite=False):
+    '''
+    Function to run one admission desk on its own process against data files in directory
+
+    Args:
+        directory (str)
+        seed (int): seed of random operations
+        n_operations (int)
+        queue (multiprocessing.Queue): accepted operation counts are put here
+        isSqlite (bool): True to use SQLite database instead of .csv files
+
+    Returns:
+        None
+    '''
+    shared = open_shared(directory, isSqlite)
+    with shared:
+        database = shared.load()
+    store = AdmissionStore(*database, shared=shared)
+    counts = {}
+    run_desk(store, seed, n_operations, counts)
+    shared.close()
+    queue.put(counts)
+
+def run_process_stress(n_processes, n_operations, isSqlite=False):
+    '''
+    Function to run admission desks on separate processes against the same data files,
+    and check the data loaded back from files
+
+    Args:
+        n_processes (int)
+        n_operations (int): operations per process
+        isSqlite (bool): True to use SQLite database instead of .csv files
+
+    Returns:
+        float, dict, list: operations per second, accepted operation counts, and broken rules
+    '''
+    directory = tempfile.mkdtemp()
+    shared = open_shared(directory, isSqlite)
+    patient_database, room_database, bed_database = new_database()
+    # the same entry points write .csv files or tables of SQLite database
+    paths = [shared.db_path] * 3 if isSqlite else shared.csv_paths
+    dict_of_list_to_csv(paths[0], patient_database)
+    list_of_dict_to_csv(paths[1], room_database)
+    list_of_dict_to_csv(paths[2], bed_database)
+
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=run_process_desk, args=(directory, seed, n_operations, queue, isSqlite))
+                 for seed in range(n_processes)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    duration = time.perf_counter() - start
+
+    counts = {}
+    for result in results:
+        for key, value in result.items():
+            counts[key] = counts.get(key, 0) + value
+    with shared:
+        store = AdmissionStore(*shared.load())
+    errors = check_store(store)
+    # every accepted admission is a new patient with one room admission row
+    if len(store.room_database) - 1 != counts["admit"] or len(store.patient_database) - 1 != counts["admit"]:
+        errors.append(f"{counts['admit']} admissions accepted, {len(store.room_database) - 1} saved")
+    shared.close()
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+    return n_processes * n_operations / duration, counts, errors
+
+if __name__ == "__main__":
+    # python stress.py [OPERATIONS PER THREAD]
+    n_operations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    isFailed = False
+    runs = [("threads", n, run_stress) for n in [1, 2, 4, 8]]
+    runs += [("processes", n, run_process_stress) for n in [2, 4]]
+    runs += [("processes on SQLite", n, lambda n, n_operations: run_process_stress(n, n_operations, isSqlite=True))
+             for n in [2, 4]]
+    for name, n, run in runs:
+        rate, counts, errors = run(n, n_operations)
+        print(f"{n} {name}: {rate:.0f} operations/s, {counts}")
+        for error in errors:
+            print(f"  FAILED {error}")
+        isFailed = isFailed or bool(errors)
+    sys.exit(1 if isFailed else 0)
@@ -0,0 +1,158 @@
+from collections import Counter
+import math
+import sys
+
+def isNumber(value):
+    '''
+    Function to check if a cell is a number, numbers are aligned right the same way tabulate does
+
+    Args:
+        value
+
+    Returns:
+        bool
+    '''
+    if isinstance(value, (int, float)):
+        return True
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return False
+    if math.isinf(number) or math.isnan(number):
+        return value.lower() in ["inf", "-inf", "nan"]
+    return True
+
+class TableRenderer:
+    '''
+    Table renderer giving the same "outline" format as tabulate, for tables displayed again and again.
+
+    Cells and rendered line of each row are kept by row position, and column widths are kept as counts
+    of cell widths, so displaying a table again only measures rows that have changed since,
+    and lines of unchanged rows are reused as long as column widths stay the same.
+
+    Args:
+        header (list): column names
+    '''
+    def __init__(self, header):
+        self.header = [str(key) for key in header]
+        # number of cells of each width, of text cells, and of number cells in each column
+        self.width_counts = [Counter() for _ in header]
+        self.text_counts = [0 for _ in header]
+        self.number_counts = [0 for _ in header]
+        # minimum width of each column is column name with 2 spaces, as in tabulate
+        self.widths = [len(key) + 2 for key in self.header]
+        # position -> cells, and position -> rendered line with widths it was rendered with
+        self.cells = {}
+        self.lines = {}
+
+    def add_cells(self, cells, kinds, sign):
+        '''
+        Function to add or remove widths of cells of a row
+
+        Args:
+            cells (tuple): cell texts of row
+            kinds (tuple): True for each number cell, False for text cell, None for missing value
+            sign (int): 1 to add, -1 to remove
+
+        Returns:
+            None
+        '''
+        for i, cell in enumerate(cells):
+            width = len(cell)
+            counts = self.width_counts[i]
+            counts[width] += sign
+            if kinds[i] is not None:
+                counts_of_kind = self.number_counts if kinds[i] else self.text_counts
+                counts_of_kind[i] += sign
+            if sign > 0:
+                if width > self.widths[i]:
+                    self.widths[i] = width
+            elif counts[width] == 0:
+                del counts[width]
+                # widest cell is removed, so look for the next widest
+                if width == self.widths[i]:
+                    self.widths[i] = max([len(self.header[i]) + 2, *counts])
+
+    def update(self, position, row):
+        '''
+        Function to keep cells of a row at a position, measuring it only if it has changed
+
+        Args:
+            position (int): row position in table
+            row (list): row values
+
+        Returns:
+            None
+        '''
+        cells = tuple("" if value is None else str(value) for value in row)
+        old = self.cells.get(position)
+        if old is not None:
+            if old[0] == cells:
+                return
+            self.add_cells(old[0], old[1], -1)
+        # missing values do not change alignment of column
+        kinds = tuple(None if value is None else isNumber(value) for value in row)
+        self.cells[position] = (cells, kinds)
+        self.lines.pop(position, None)
+        self.add_cells(cells, kinds, 1)
+
+    def truncate(self, length):
+        '''
+        Function to forget rows at or after a position, when table has fewer rows than before
+
+        Args:
+            length (int): number of rows in table
+
+        Returns:
+            None
+        '''
+        for position in [position for position in self.cells if position >= length]:
+            cells, kinds = self.cells.pop(position)
+            self.lines.pop(position, None)
+            self.add_cells(cells, kinds, -1)
+
+    def format_line(self, cells, isRight):
+        '''
+        Function to format cells into a table line with current column widths
+
+        Args:
+            cells (tuple): cell texts
+            isRight (list): True for each column aligned right
+
+        Returns:
+            str
+        '''
+        return "| " + " | ".join(cell.rjust(width) if right else cell.ljust(width)
+                                 for cell, width, right in zip(cells, self.widths, isRight)) + " |"
+
+    def render(self, rows, start=0, file=None):
+        '''
+        Function to write table of rows into file, rows are kept as rows at positions start, start+1, and so on
+
+        Args:
+            rows (list): row values of rows to display
+            start (int): position of first row in table
+            file (file or None): file to write into, None for standard output
+
+        Returns:
+            None
+        '''
+        file = file or sys.stdout
+        for i, row in enumerate(rows):
+            self.update(start + i, row)
+
+        widths = tuple(self.widths)
+        # a column is aligned right if every cell kept in it is a number or missing
+        isRight = [texts == 0 and numbers > 0 for texts, numbers in zip(self.text_counts, self.number_counts)]
+        key = (widths, tuple(isRight))
+        border = "+" + "+".join("-" * (width + 2) for width in widths) + "+"
+        file.write(border + "\n")
+        file.write(self.format_line(self.header, isRight) + "\n")
+        file.write("+" + "+".join("=" * (width + 2) for width in widths) + "+\n")
+        for position in range(start, start + len(rows)):
+            line = self.lines.get(position)
+            if line is None or line[0] != key:
+                line = (key, self.format_line(self.cells[position][0], isRight))
+                self.lines[position] = line
+            file.write(line[1] + "\n")
+        file.write(border + "\n")